@@ -0,0 +1,113 @@
+"""Store fetch throughput, browser vs. plain HTTP, against a recorded crawl.
+
+Record a crawl first (see replay_crawl.py), then:
+
+    python benchmarks/fetchers.py recordings --workers 4
+    python benchmarks/fetchers.py recordings --http-only
+"""
+import argparse
+import os
+import sys
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue, Empty
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from models.Company import Company  # noqa: E402
+from scraper.dm_scraper import DMScraper  # noqa: E402
+from scraper.driver_pool import DriverPool, browser_profile_from_opts  # noqa: E402
+from scraper.fetchers import FETCHER_BROWSER, FETCHER_HTTP, http_pool_from_opts  # noqa: E402
+from scraper.replay import ReplayServer  # noqa: E402
+
+
+def store_urls(server: ReplayServer) -> list[str]:
+    listings = set(server.cities.values())
+    return [server.url + path for path in server.pages if path not in listings]
+
+
+def fetch_all(scraper: DMScraper, stores: Queue) -> int:
+    products = 0
+
+    while True:
+        try:
+            url = stores.get_nowait()
+        except Empty:
+            return products
+
+        company_info = Company(name=url, rating=None, banners=[], city=None,
+                               is_closed=False, company_url=url, image_url=None)
+        fetcher = scraper.fetcher
+        products += len(fetcher.products(company_info,
+                        fetcher.load(company_info)))
+
+
+def run(urls: list[str], fetcher: str, workers: int, opts: dict) -> dict:
+    stores = Queue()
+    for url in urls:
+        stores.put(url)
+
+    def scraper(driver=None) -> DMScraper:
+        s = DMScraper()
+        s.driver = driver
+        s.fetcher_name = fetcher
+        s.http = http
+        return s
+
+    http = http_pool_from_opts({**opts, "store_workers": workers})
+
+    if fetcher == FETCHER_HTTP:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(workers) as executor:
+            products = sum(executor.map(
+                lambda _: fetch_all(scraper(), stores), range(workers)))
+        elapsed = time.perf_counter() - start
+    else:
+        with DriverPool(workers, profile=browser_profile_from_opts(opts)) as pool:
+            drivers = [pool.acquire() for _ in range(workers)]
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(workers) as executor:
+                products = sum(executor.map(
+                    lambda d: fetch_all(scraper(d), stores), drivers))
+            elapsed = time.perf_counter() - start
+
+            for driver in drivers:
+                pool.release(driver)
+
+    return {
+        "seconds": elapsed,
+        "stores_per_second": len(urls) / elapsed,
+        "products_per_second": products / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("recording")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--http-only", action="store_true",
+                        help="skip the browser fetcher (no Chrome needed)")
+    args = parser.parse_args()
+
+    fetchers = [FETCHER_HTTP] if args.http_only else [
+        FETCHER_BROWSER, FETCHER_HTTP]
+
+    with ReplayServer(args.recording) as server:
+        urls = store_urls(server)
+        print(f"{len(urls)} recorded stores, {args.workers} workers")
+
+        for fetcher in fetchers:
+            for round in range(args.rounds):
+                result = run(urls, fetcher, args.workers, {})
+                print(
+                    f"{fetcher} round {round + 1}: "
+                    f"{result['stores_per_second']:.2f} stores/s, "
+                    f"{result['products_per_second']:.1f} products/s"
+                )
+
+
+if __name__ == "__main__":
+    main()
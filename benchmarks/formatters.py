@@ -0,0 +1,125 @@
+"""Compares the Python-callback formatters with the native-expression ones.
+
+    python benchmarks/formatters.py --rows 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import polars as pl
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from models.Company import company_column_map  # noqa: E402
+from models.Product import product_column_map  # noqa: E402
+from utils import format_df, format_cdf  # noqa: E402
+
+
+def get_rating_string(value: float | None):
+    if value is None or value < 0:
+        return ''
+    rounded_value = round(value)
+    return "★" * rounded_value + " " + str(value)
+
+
+def legacy_format_df(df: pl.DataFrame) -> pl.DataFrame:
+    return df.select(
+        pl.col("name").alias(product_column_map['name']),
+        pl.col("original_price").alias(product_column_map['original_price']),
+        pl.col("final_price").alias(product_column_map['final_price']),
+        pl.when(pl.col("original_price") > 0).then(
+            (pl.col("original_price") - pl.col("final_price")) /
+            pl.col("original_price") * 100
+        ).otherwise(0).cast(pl.Float32).alias(product_column_map['discount_percentage']),
+        pl.col("company_name").alias(product_column_map['company_name']),
+        pl.col("city").alias(product_column_map['city']),
+        pl.col("category").alias(product_column_map['category']),
+        pl.col("company_url").alias(product_column_map['company_url']),
+        pl.col("image_url").alias(product_column_map['image_url']),
+        pl.col("is_closed").map_elements(lambda x: "Não" if x else "Sim", return_dtype=pl.Utf8).alias(
+            product_column_map['is_open']
+        ),
+    ).fill_null("")
+
+
+def legacy_format_cdf(df: pl.DataFrame) -> pl.DataFrame:
+    return df.select(
+        pl.col("name").alias(company_column_map['name']),
+        pl.col("rating").map_elements(
+            get_rating_string,
+            return_dtype=pl.Utf8
+        ).alias(company_column_map['rating']),
+        pl.col("city").alias(company_column_map['city']),
+        pl.col("banners").alias(company_column_map['banners']),
+        pl.col("company_url").alias(company_column_map['company_url']),
+        pl.col("image_url").alias(company_column_map['image_url']),
+        pl.col("is_closed").map_elements(lambda x: "Sim" if x else "Não").alias(
+            company_column_map['is_open']
+        ),
+    ).fill_null("")
+
+
+def synthetic_products(rows: int) -> pl.DataFrame:
+    rng = np.random.default_rng(0)
+    price = rng.uniform(1, 200, rows).round(2)
+
+    return pl.DataFrame({
+        "name": pl.Series([f"Produto {i % 5000}" for i in range(rows)]),
+        "original_price": price,
+        "final_price": (price * rng.uniform(0.7, 1, rows)).round(2),
+        "category": pl.Series([f"categoria {i % 40}" for i in range(rows)]),
+        "company_name": pl.Series([f"Empresa {i % 3000}" for i in range(rows)]),
+        "is_closed": rng.random(rows) < 0.1,
+        "city": pl.Series([f"Cidade {i % 30}" for i in range(rows)]),
+        "company_url": pl.Series([f"https://example.com/{i % 3000}" for i in range(rows)]),
+        "image_url": pl.Series([f"https://example.com/{i}.png" for i in range(rows)]),
+    })
+
+
+def synthetic_companies(rows: int) -> pl.DataFrame:
+    rng = np.random.default_rng(1)
+
+    return pl.DataFrame({
+        "name": pl.Series([f"Empresa {i}" for i in range(rows)]),
+        "rating": pl.Series(rng.uniform(0, 5, rows).round(1)).set(pl.Series(rng.random(rows) < 0.05), None),
+        "banners": [["Entrega grátis"] if i % 3 else [] for i in range(rows)],
+        "city": pl.Series([f"Cidade {i % 30}" for i in range(rows)]),
+        "is_closed": rng.random(rows) < 0.1,
+        "company_url": pl.Series([f"https://example.com/{i}" for i in range(rows)]),
+        "image_url": pl.Series([f"https://example.com/{i}.png" for i in range(rows)]),
+    })
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    products = synthetic_products(args.rows)
+    companies = synthetic_companies(args.rows)
+
+    results = {
+        "legacy format_df": timed(lambda: legacy_format_df(products), args.repeat),
+        "format_df": timed(lambda: format_df(products).collect(), args.repeat),
+        "legacy format_cdf": timed(lambda: legacy_format_cdf(companies), args.repeat),
+        "format_cdf": timed(lambda: format_cdf(companies).collect(), args.repeat),
+    }
+
+    for name, seconds in results.items():
+        print(f"{name:>18}: {seconds * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
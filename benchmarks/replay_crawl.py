@@ -0,0 +1,130 @@
+"""End-to-end crawl benchmark against a recorded copy of the site.
+
+Record a crawl once (this hits the live site):
+
+    python benchmarks/replay_crawl.py --record recordings "FLORIANOPOLIS"
+
+Then benchmark offline against the recording:
+
+    python benchmarks/replay_crawl.py recordings
+"""
+import argparse
+import os
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from scraper.dm_scraper import DMScraper  # noqa: E402
+from scraper.driver_pool import DriverPool, browser_profile_from_opts  # noqa: E402
+from scraper.replay import ReplayServer  # noqa: E402
+
+
+class CountingDriverPool(DriverPool):
+    """Counts every WebDriver command sent by the drivers it hands out."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.commands = 0
+
+    def acquire(self, timeout=None):
+        driver = super().acquire(timeout)
+
+        if not hasattr(driver, "_uncounted_execute"):
+            driver._uncounted_execute = driver.execute
+
+            def execute(*args, **kwargs):
+                self.commands += 1
+                return driver._uncounted_execute(*args, **kwargs)
+
+            driver.execute = execute
+
+        return driver
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return max(usage, children) / scale
+
+
+def crawl(cities: list[str], opts: dict) -> dict:
+    stores = 0
+    products = 0
+
+    def callback(*, product_data=None, company_data=None):
+        nonlocal stores, products
+        if company_data:
+            stores += 1
+        if product_data:
+            products += len(product_data)
+
+    driver_pool = CountingDriverPool(
+        max_size=opts.get("store_workers", 1),
+        profile=browser_profile_from_opts(opts)
+    )
+
+    with driver_pool:
+        # the first checkout pays for the Chrome startup, keep it out of the timing
+        driver_pool.release(driver_pool.acquire())
+        driver_pool.commands = 0
+
+        start = time.perf_counter()
+        for city in cities:
+            DMScraper(driver_pool).scrape_city(
+                city, opts=opts, callback=callback)
+        elapsed = time.perf_counter() - start
+
+    return {
+        "seconds": elapsed,
+        "stores": stores,
+        "products": products,
+        "stores_per_second": stores / elapsed,
+        "products_per_second": products / elapsed,
+        "commands_per_product": driver_pool.commands / products if products else 0,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("recording")
+    parser.add_argument("cities", nargs="*",
+                        help="cities to record, or to replay (default: every recorded city)")
+    parser.add_argument("--record", action="store_true",
+                        help="crawl the live site and save the pages into the recording")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--store-workers", type=int, default=1)
+    parser.add_argument("--extraction-mode", default="snapshot",
+                        choices=["snapshot", "elements"])
+    args = parser.parse_args()
+
+    opts = {
+        "store_workers": args.store_workers,
+        "extraction_mode": args.extraction_mode,
+    }
+
+    if args.record:
+        print(crawl(args.cities, {
+              **opts, "record_dir": args.recording, "use_cache": False}))
+        return
+
+    with ReplayServer(args.recording) as server:
+        cities = args.cities or list(server.cities)
+
+        for round in range(args.rounds):
+            result = crawl(cities, server.opts(**opts))
+            print(
+                f"round {round + 1}: "
+                f"{result['stores_per_second']:.2f} stores/s, "
+                f"{result['products_per_second']:.1f} products/s, "
+                f"{result['commands_per_product']:.2f} WebDriver calls/product, "
+                f"peak RSS {result['peak_rss_mb']:.0f} MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Compares page throughput and bytes transferred with and without the
+resource-blocking browser profile.
+
+Serve a saved copy of the site locally and pass the page URLs to load:
+
+    python -m http.server 8000 --directory saved_site
+    python benchmarks/resource_blocking.py http://localhost:8000/cidade.html http://localhost:8000/loja.html
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from scraper.driver_pool import BrowserProfile, FULL_PROFILE, create_driver  # noqa: E402
+
+TRANSFERRED_BYTES_SCRIPT = """
+return performance.getEntriesByType('navigation')
+    .concat(performance.getEntriesByType('resource'))
+    .reduce((total, entry) => total + (entry.transferSize || entry.encodedBodySize || 0), 0);
+"""
+
+
+def run(profile: BrowserProfile, urls: list[str], rounds: int) -> tuple[float, int]:
+    driver = create_driver(profile)
+    transferred = 0
+
+    try:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for url in urls:
+                driver.get(url)
+                transferred += driver.execute_script(TRANSFERRED_BYTES_SCRIPT)
+        elapsed = time.perf_counter() - start
+    finally:
+        driver.quit()
+
+    return len(urls) * rounds / elapsed * 60, transferred
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("urls", nargs="+")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    for name, profile in [("full", FULL_PROFILE), ("blocking", BrowserProfile())]:
+        pages_per_minute, transferred = run(profile, args.urls, args.rounds)
+        print(
+            f"{name:>8}: {pages_per_minute:8.1f} pages/min, {transferred / 1024:10.1f} KiB transferred")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,23 @@
 from consts import GlobalState
-from utils import format_df, format_cdf, container, apply_filters, ALL_KEYWORD
+from export import export_formats, export_frame
+from utils import format_df, format_cdf, container, apply_filters, discount_percentage_expr, ALL_KEYWORD
 import traceback
-import io
+import math
+import os
 import polars as pl
 import streamlit as st
-from models.Product import Product, product_column_map
-from models.Company import Company
+from models.Product import ProductBatch, product_column_map, product_schema, product_categorical_columns
+from models.Company import Company, company_column_map, company_schema, company_categorical_columns
+from models.ColumnarAccumulator import ColumnarAccumulator
+from models.FilterIndex import FilterIndex
+from models.FilterCache import FilterCache, freeze_filters
 from models.DfInfo import DfInfo
+from scraper.async_scraper import ENGINE_ASYNC, ENGINE_SELENIUM, DEFAULT_MAX_TABS
+from scraper.city_cache import CityCache, city_cache_from_opts, find_city, normalize_city_query
 from scraper.main import retrieve_data
+from scraper.telemetry import CrawlMetrics
 from datetime import datetime
+from typing import Optional
 
 product_column_config = {
     "Preço Original": st.column_config.NumberColumn(
@@ -41,6 +50,38 @@ company_column_config = {
     ),
 }
 
+PAGE_SIZES = [25, 50, 100, 500]
+
+product_sort_columns = {
+    "name": pl.col("name"),
+    "original_price": pl.col("original_price"),
+    "final_price": pl.col("final_price"),
+    "discount_percentage": discount_percentage_expr(),
+    "company_name": pl.col("company_name").cast(pl.Utf8),
+    "city": pl.col("city").cast(pl.Utf8),
+    "category": pl.col("category").cast(pl.Utf8),
+}
+
+company_sort_columns = {
+    "name": pl.col("name"),
+    "rating": pl.col("rating"),
+    "city": pl.col("city").cast(pl.Utf8),
+}
+
+
+def new_product_index() -> FilterIndex:
+    return FilterIndex(
+        value_columns=product_categorical_columns,
+        range_columns=["original_price", "final_price"]
+    )
+
+
+def new_company_index() -> FilterIndex:
+    return FilterIndex(
+        value_columns=company_categorical_columns,
+        list_columns=["banners"]
+    )
+
 
 class App:
     def __init__(self):
@@ -67,47 +108,192 @@ class App:
             st.session_state.cdf = pl.DataFrame()
 
         self.include_closed_stores = False
+        self.use_cache = True
+        self.cache_ttl_hours = 24
+        self.use_tabs = False
+        self.max_tabs = DEFAULT_MAX_TABS
+
+        # the checkbox is rendered after the city form, so read its last value
+        self.use_city_cache = st.session_state.get("use_city_cache", True)
+
+        if st.session_state.get("city_cache_enabled") != self.use_city_cache:
+            if st.session_state.get("city_cache"):
+                st.session_state.city_cache.close()
+
+            st.session_state.city_cache = city_cache_from_opts(
+                {"use_city_cache": self.use_city_cache})
+            st.session_state.city_cache_enabled = self.use_city_cache
+
+        if 'product_index' not in st.session_state:
+            st.session_state.product_index = new_product_index()
+            st.session_state.product_index.update_frame(st.session_state.df)
+
+        if 'company_index' not in st.session_state:
+            st.session_state.company_index = new_company_index()
+            st.session_state.company_index.update_frame(st.session_state.cdf)
+
+        if 'filter_cache' not in st.session_state:
+            st.session_state.filter_cache = FilterCache()
+
+        if 'dataset_version' not in st.session_state:
+            st.session_state.dataset_version = 0
+
+        if 'df_info' not in st.session_state:
+            st.session_state.df_info = DfInfo(st.session_state.df)
 
         self.df: pl.DataFrame = st.session_state.df
         self.cdf: pl.DataFrame = st.session_state.cdf
+        self.filter_cache: FilterCache = st.session_state.filter_cache
+        self.product_index: FilterIndex = st.session_state.product_index
+        self.company_index: FilterIndex = st.session_state.company_index
         self.state: GlobalState = GlobalState.FINISHED if not self.df.is_empty() else GlobalState.IDLE
-        self.df_info = DfInfo(self.df)
+        self.df_info: DfInfo = st.session_state.df_info
+        self.metrics: CrawlMetrics = st.session_state.get("crawl_metrics")
+        self.city_cache: Optional[CityCache] = st.session_state.city_cache
 
     def handle_fetch_data_click(self):
         self.state = GlobalState.FETCHING
         self.render_data_fetch_section()
 
+        # an interrupted crawl is resumed from its journal, so each fetch
+        # starts from an empty frame to avoid duplicating rows
+        self.product_index = new_product_index()
+        self.company_index = new_company_index()
+        self.df_info = DfInfo()
+
+        products_accumulator = ColumnarAccumulator(
+            product_schema,
+            categorical=product_categorical_columns,
+            index=self.product_index
+        )
+        companies_accumulator = ColumnarAccumulator(
+            company_schema,
+            categorical=company_categorical_columns,
+            index=self.company_index
+        )
+
+        self.metrics = CrawlMetrics()
+        st.session_state.crawl_metrics = self.metrics
+
         try:
             def update_companies(companies: list[Company]):
-                self.cdf = self.cdf.vstack(pl.DataFrame(companies))
+                companies_accumulator.append(companies)
+
+            def update_products(products: ProductBatch):
+                products_accumulator.append(products)
+                self.df_info.update(products)
 
-            def update_products(products: list[Product]):
-                self.df_info.df = self.df_info.df.vstack(
-                    pl.DataFrame(products))
+            rendered_rows = 0
 
-                self.render_data_preview_section()
+            def refresh():
+                nonlocal rendered_rows
+
+                if products_accumulator.rows() != rendered_rows:
+                    rendered_rows = products_accumulator.rows()
+                    self.df_info.df = products_accumulator.to_polars()
+                    self.render_data_preview_section()
+
+                self.render_crawl_metrics_section()
 
             opts = {
-                "include_closed_stores": self.include_closed_stores
+                "include_closed_stores": self.include_closed_stores,
+                "use_cache": self.use_cache,
+                "cache_ttl": self.cache_ttl_hours * 60 * 60,
+                "use_city_cache": self.use_city_cache,
+                "engine": ENGINE_ASYNC if self.use_tabs else ENGINE_SELENIUM,
+                "max_tabs": self.max_tabs,
             }
 
             retrieve_data(
                 cities=st.session_state.cities,
                 opts=opts,
                 update_product_callback=update_products,
-                update_company_callback=update_companies
+                update_company_callback=update_companies,
+                metrics=self.metrics,
+                refresh_callback=refresh
             )
-
-            self.df = self.df_info.df.clone()
-            st.session_state.df = self.df
-            st.session_state.cdf = self.cdf
         except Exception as e:
             st.error(f"Erro ao buscar dados: {str(e)}")
             st.error(traceback.format_exc())
         finally:
+            self.df = products_accumulator.finish()
+            self.cdf = companies_accumulator.finish()
+            self.df_info.df = self.df
+            st.session_state.df = self.df
+            st.session_state.cdf = self.cdf
+            st.session_state.product_index = self.product_index
+            st.session_state.company_index = self.company_index
+            st.session_state.df_info = self.df_info
+            st.session_state.dataset_version += 1
+            self.filter_cache.clear()
+
             self.state = GlobalState.FINISHED
             st.session_state.state = GlobalState.FINISHED
 
+    def filtered_table(self, kind: str, filters: dict) -> pl.DataFrame:
+        """Filtered products or companies, memoized per filter state."""
+        df = self.df if kind == "products" else self.cdf
+
+        return self.filter_cache.get_or_compute(
+            (st.session_state.dataset_version, kind, freeze_filters(filters)),
+            lambda: apply_filters(df, filters).collect()
+        )
+
+    def render_table_page(self, df: pl.DataFrame, *, formatter, sort_columns: dict[str, pl.Expr], column_map: dict, column_config: dict, key: str):
+        """Sorts the table and formats and renders only the visible page."""
+        total_rows = df.height
+
+        c1, c2, c3, c4 = st.columns([2, 1, 1, 1])
+
+        with c1:
+            sort_column = st.selectbox(
+                "Ordenar por",
+                list(sort_columns),
+                format_func=lambda c: column_map[c],
+                key=f"{key}_sort"
+            )
+
+        with c2:
+            descending = st.toggle("Decrescente", key=f"{key}_descending")
+
+        with c3:
+            page_size = st.selectbox(
+                "Linhas por página",
+                PAGE_SIZES,
+                index=1,
+                key=f"{key}_page_size"
+            )
+
+        pages = max(1, math.ceil(total_rows / page_size))
+
+        # filters may have shrunk the table since the page was chosen
+        if st.session_state.get(f"{key}_page", 1) > pages:
+            st.session_state[f"{key}_page"] = pages
+
+        with c4:
+            page = st.number_input(
+                "Página",
+                min_value=1,
+                max_value=pages,
+                step=1,
+                key=f"{key}_page"
+            )
+
+        page_df = formatter(
+            df.lazy()
+            .sort(sort_columns[sort_column], descending=descending, nulls_last=True)
+            .slice((page - 1) * page_size, page_size)
+        ).collect()
+
+        st.dataframe(
+            page_df,
+            hide_index=True,
+            use_container_width=True,
+            column_config=column_config
+        )
+
+        st.caption(f"Página {page} de {pages} · {total_rows} linhas")
+
     @container("city_selection")
     def render_city_selection_section(self):
         st.header("🏙️ Seleção de Cidades")
@@ -115,28 +301,55 @@ class App:
         if 'cities' not in st.session_state:
             st.session_state.cities = []
 
+        known_cities = {
+            entry.query: entry for entry in self.city_cache.entries()} if self.city_cache else {}
+
+        def add_city(city_input: str):
+            if not city_input:
+                st.toast("O nome da cidade não pode estar vazio")
+                return
+
+            entry = find_city(list(known_cities.values()), city_input)
+            city = entry.query if entry else normalize_city_query(city_input)
+
+            if city in st.session_state.cities:
+                st.toast(f"Cidade '{city_input}' já foi adicionada!")
+            elif entry:
+                st.session_state.cities.append(city)
+                st.toast(f"Cidade '{entry.title}' adicionada!")
+            else:
+                st.session_state.cities.append(city)
+                st.toast(
+                    f"Cidade '{city_input}' adicionada! Ela será buscada no site na primeira coleta.")
+
+        def add_known_city():
+            add_city(st.session_state.known_city)
+            st.session_state.known_city = None
+
         c1, c2 = st.columns([0.4, 0.6])
 
         with c1:
+            if known_cities:
+                st.selectbox(
+                    "Cidades já encontradas",
+                    options=list(known_cities),
+                    format_func=lambda query: known_cities[query].title,
+                    index=None,
+                    placeholder="Escolha ou digite para filtrar",
+                    key="known_city",
+                    on_change=add_known_city
+                )
+
             with st.form("city_form", clear_on_submit=True):
                 city_input = st.text_input("Digite o nome da cidade")
                 if st.form_submit_button(label="Adicionar Cidade", use_container_width=True):
-                    if city_input:
-                        city = city_input.upper()
-                        if city in st.session_state.cities:
-                            st.toast(
-                                f"Cidade '{city_input}' já foi adicionada!")
-                        else:
-                            st.session_state.cities.append(city_input.upper())
-                            st.toast(f"Cidade '{city_input}' adicionada!")
-                    else:
-                        st.toast("O nome da cidade não pode estar vazio")
+                    add_city(city_input)
 
         with c2:
             st.subheader("Cidades Selecionadas")
             for city in st.session_state.cities:
                 col1, col2 = st.columns([3, 1])
-                col1.write(city)
+                col1.write(known_cities[city].title if city in known_cities else city)
                 if col2.button("Remover", key=city):
                     st.session_state.cities.remove(city)
                     st.rerun()
@@ -148,6 +361,42 @@ class App:
         self.include_closed_stores = st.checkbox(
             "Incluir lojas fechadas")
 
+        c1, c2 = st.columns(2)
+
+        with c1:
+            self.use_cache = st.checkbox(
+                "Reutilizar lojas buscadas recentemente", value=True)
+
+        with c2:
+            self.cache_ttl_hours = st.number_input(
+                "Validade do cache (horas)",
+                min_value=0.0,
+                value=24.0,
+                step=1.0,
+                disabled=not self.use_cache
+            )
+
+        self.use_city_cache = st.checkbox(
+            "Abrir cidades já encontradas direto pela página da cidade",
+            value=True,
+            key="use_city_cache"
+        )
+
+        c1, c2 = st.columns(2)
+
+        with c1:
+            self.use_tabs = st.checkbox(
+                "Visitar lojas em abas paralelas (experimental)")
+
+        with c2:
+            self.max_tabs = st.number_input(
+                "Abas por navegador",
+                min_value=1,
+                max_value=64,
+                value=DEFAULT_MAX_TABS,
+                disabled=not self.use_tabs
+            )
+
     @container("fetch")
     def render_data_fetch_section(self):
         button_click = False
@@ -186,7 +435,7 @@ class App:
                 st.write(
                     f"Empresas visitadas: {self.df_info.company_visited()}")
                 st.write(
-                    f"Uso de memória: {self.df_info.memory_usage()} MB"
+                    f"Uso de memória: {self.df_info.memory_usage():.1f} MB"
                 )
 
             with col2:
@@ -195,12 +444,67 @@ class App:
                 st.dataframe(
                     format_df(
                         self.df_info.df.head(10)
-                    ),
+                    ).collect(),
                     hide_index=True,
                     use_container_width=True,
                     column_config=product_column_config
                 )
 
+    @container("crawl_metrics")
+    def render_crawl_metrics_section(self):
+        if self.metrics is None or self.state < GlobalState.FETCHING:
+            return
+
+        snapshot = self.metrics.snapshot()
+
+        with st.expander("📈 Progresso da Busca", expanded=self.state == GlobalState.FETCHING):
+            c1, c2, c3, c4, c5 = st.columns(5)
+            c1.metric("Lojas/min", f"{snapshot['stores_per_minute']:.1f}")
+            c2.metric("Produtos/min", f"{snapshot['products_per_minute']:.0f}")
+            c3.metric("Timeouts", snapshot["timeouts"])
+            c4.metric("Tentativas", snapshot["retries"])
+            c5.metric("Erros", snapshot["errors"])
+
+            for city, progress in snapshot["cities"].items():
+                listed = progress["listed"]
+                if listed:
+                    st.progress(
+                        min(progress["stores"] / listed, 1.0),
+                        text=f"{city}: {progress['stores']} de {listed} lojas"
+                    )
+                else:
+                    st.progress(
+                        1.0 if progress["finished"] else 0.0,
+                        text=f"{city}: {progress['stores']} lojas"
+                    )
+
+            timings = [
+                {"Etapa": "carregamento da loja", **snapshot["page_load"]},
+                *({"Etapa": label, **summary}
+                  for label, summary in snapshot["waits"].items())
+            ]
+
+            if any(t["count"] for t in timings):
+                st.dataframe(
+                    pl.DataFrame(timings).select(
+                        "Etapa", "count", "p50", "p95", "max"),
+                    hide_index=True,
+                    use_container_width=True,
+                    column_config={
+                        "count": st.column_config.NumberColumn("Amostras"),
+                        "p50": st.column_config.NumberColumn("p50 (s)", format="%.2f"),
+                        "p95": st.column_config.NumberColumn("p95 (s)", format="%.2f"),
+                        "max": st.column_config.NumberColumn("Máx (s)", format="%.2f"),
+                    }
+                )
+
+            if snapshot["driver_memory_mb"]:
+                st.caption("Memória JS dos navegadores: " + ", ".join(
+                    f"{mb:.0f} MB" for mb in snapshot["driver_memory_mb"].values()))
+
+            st.caption(
+                f"Métricas em {self.metrics.directory} (metrics.json, metrics.prom)")
+
     @container("analysis")
     def render_data_analysis_section(self):
         if self.state < GlobalState.FINISHED:
@@ -208,16 +512,8 @@ class App:
 
         st.header("📊 Análise de Dados", anchor="data-analysis")
 
-        op_price_min, op_price_max, fp_price_min, fp_price_max = self.df.select(
-            pl.col('original_price').min().floor().cast(
-                pl.Float32).alias('op_price_min'),
-            pl.col('original_price').max().ceil().cast(
-                pl.Float32).alias('op_price_max'),
-            pl.col('final_price').min().floor().cast(
-                pl.Float32).alias('fp_price_min'),
-            pl.col('final_price').max().ceil().cast(
-                pl.Float32).alias('fp_price_max'),
-        ).row(0)
+        op_price_min, op_price_max = self.product_index.range('original_price')
+        fp_price_min, fp_price_max = self.product_index.range('final_price')
 
         product_filters = {
             "city": [],
@@ -238,13 +534,8 @@ class App:
             with company_tab:
                 c1, c2 = st.columns(2)
 
-                unique_cities = self.cdf.select(
-                    pl.col('city').unique()
-                ).to_series().to_list()
-
-                unique_banners = self.cdf.select(
-                    pl.col('banners').explode().unique()
-                ).to_series().to_list()
+                unique_cities = self.company_index.values('city')
+                unique_banners = self.company_index.values('banners')
 
                 with c1:
 
@@ -260,13 +551,13 @@ class App:
                         unique_banners
                     )
 
-                display_table = apply_filters(self.cdf, company_filters)
-
-                st.dataframe(
-                    format_cdf(display_table),
-                    hide_index=True,
-                    use_container_width=True,
-                    column_config=company_column_config
+                self.render_table_page(
+                    self.filtered_table("companies", company_filters),
+                    formatter=format_cdf,
+                    sort_columns=company_sort_columns,
+                    column_map=company_column_map,
+                    column_config=company_column_config,
+                    key="company_table"
                 )
 
                 st.session_state.company_filters = company_filters
@@ -275,17 +566,9 @@ class App:
             with product_tab:
                 c1, c2, c3 = st.columns(3)
 
-                unique_cities = self.df.select(
-                    pl.col('city').unique()
-                ).to_series().to_list()
-
-                unique_categories = self.df.select(
-                    pl.col('category').unique()
-                ).to_series().to_list()
-
-                unique_companies = self.df.select(
-                    pl.col('company_name').unique()
-                ).to_series().to_list()
+                unique_cities = self.product_index.values('city')
+                unique_categories = self.product_index.values('category')
+                unique_companies = self.product_index.values('company_name')
 
                 with c1:
                     product_filters['city'] = st.multiselect(
@@ -330,13 +613,28 @@ class App:
                         step=0.1
                     )
 
-                display_table = apply_filters(self.df, product_filters)
-
-                st.dataframe(
-                    format_df(display_table),
-                    hide_index=True,
-                    use_container_width=True,
-                    column_config=product_column_config
+                filtered_products = self.filtered_table(
+                    "products", product_filters)
+
+                companies, mean_price, mean_discount = filtered_products.lazy().select(
+                    pl.col("company_url").n_unique(),
+                    pl.col("final_price").mean(),
+                    discount_percentage_expr().mean(),
+                ).collect().row(0)
+
+                m1, m2, m3, m4 = st.columns(4)
+                m1.metric("Produtos", filtered_products.height)
+                m2.metric("Empresas", companies)
+                m3.metric("Preço final médio", f"R$ {mean_price or 0:.2f}")
+                m4.metric("Desconto médio", f"{mean_discount or 0:.1f}%")
+
+                self.render_table_page(
+                    filtered_products,
+                    formatter=format_df,
+                    sort_columns=product_sort_columns,
+                    column_map=product_column_map,
+                    column_config=product_column_config,
+                    key="product_table"
                 )
 
                 st.session_state.product_filters = product_filters
@@ -346,12 +644,8 @@ class App:
         if self.state < GlobalState.FINISHED:
             return
 
-        SHOULD_FORMAT_DF_FILE_FORMATS = ["Excel", "HTML"]
-
         st.header("💾 Exportação de Dados", anchor="data-export")
 
-        raw_df = None
-
         if not self.df.is_empty():
             selected_df = st.selectbox(
                 "Selecione quais dados exportar",
@@ -365,132 +659,97 @@ class App:
             )
 
             if selected_df == "Produtos":
-                raw_df = format_df(self.df.clone()).to_pandas()
+                kind = "products"
+                formatter = format_df
                 raw_filters = st.session_state.product_filters
-
-                def format_fn(df): return df.style.format({
+                number_formats = {
+                    product_column_map['original_price']: '"R$" #,##0.00',
+                    product_column_map['final_price']: '"R$" #,##0.00',
+                    product_column_map['discount_percentage']: '0"%"',
+                }
+                value_formats = {
                     product_column_map['original_price']: "R$ {:.2f}",
                     product_column_map['final_price']: "R$ {:.2f}",
                     product_column_map['discount_percentage']: "{:.0f}%",
-                })
+                }
             else:
-                raw_df = format_cdf(self.cdf.clone()).to_pandas()
+                kind = "companies"
+                formatter = format_cdf
                 raw_filters = st.session_state.company_filters
-
-                def format_fn(df): return df.style
+                number_formats = {}
+                value_formats = {}
 
             # Seleção de formato de arquivo
             export_format = st.selectbox(
                 "Selecione o formato de exportação",
-                ["CSV", "Excel", "JSON", "Parquet", "HTML"]
+                list(export_formats)
             )
 
+            options = {}
+
             # Opções de exportação baseadas no formato
             match export_format:
                 case "CSV":
                     col1, col2 = st.columns(2)
                     with col1:
-                        delimiter = st.selectbox(
+                        options["delimiter"] = st.selectbox(
                             "Delimitador", [",", ";", "\t", "|"], index=0)
                     with col2:
-                        encoding = st.selectbox(
+                        options["encoding"] = st.selectbox(
                             "Codificação", ["utf-8", "latin1", "iso-8859-1", "cp1252"], index=0)
-                    include_index = st.checkbox("Incluir índice", value=False)
+                    options["include_index"] = st.checkbox(
+                        "Incluir índice", value=False)
 
                 case "Excel":
-                    sheet_name = st.text_input("Nome da planilha", "Sheet1")
-                    include_index = st.checkbox("Incluir índice", value=False)
+                    options["sheet_name"] = st.text_input(
+                        "Nome da planilha", "Sheet1")
+                    options["include_index"] = st.checkbox(
+                        "Incluir índice", value=False)
+                    options["number_formats"] = number_formats
 
                 case "JSON":
-                    orient = st.selectbox("Orientação JSON",
-                                          ["records", "columns",
-                                           "index", "split", "table"],
-                                          index=0)
-                    date_format = st.selectbox(
+                    options["orient"] = st.selectbox(
+                        "Orientação JSON", ["records", "columns", "index", "split"], index=0)
+                    options["date_format"] = st.selectbox(
                         "Formato de data", ["epoch", "iso"], index=1)
 
                 case "Parquet":
-                    compression = st.selectbox(
+                    options["compression"] = st.selectbox(
                         "Compressão", ["snappy", "gzip", "brotli", "none"], index=0)
 
+                case "HTML":
+                    options["value_formats"] = value_formats
+
             # Botão de exportação
             export_button = st.button("Exportar Dados")
 
             if export_button:
-                if export_filtered:
-                    raw_df = apply_filters(raw_df, raw_filters)
-
-                if export_format in SHOULD_FORMAT_DF_FILE_FORMATS:
-                    raw_df = format_fn(raw_df)
-
                 try:
-                    # Criar buffer em memória para o arquivo
-                    buffer = io.BytesIO()
-
-                    if export_format == "CSV":
-                        raw_df.to_csv(
-                            buffer,
-                            sep=delimiter,
-                            index=include_index,
-                            encoding=encoding
-                        )
+                    source = formatter(self.filtered_table(
+                        kind, raw_filters if export_filtered else {}))
 
-                        file_extension = "csv"
-                        mime_type = "text/csv"
-
-                    elif export_format == "Excel":
-                        raw_df.to_excel(
-                            buffer,
-                            sheet_name=sheet_name,
-                            index=include_index,
-                            engine="openpyxl"
-                        )
-
-                        file_extension = "xlsx"
-                        mime_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-
-                    elif export_format == "JSON":
-                        raw_df.to_json(
-                            buffer,
-                            orient=orient,
-                            date_format=date_format
-                        )
-
-                        file_extension = "json"
-                        mime_type = "application/json"
-
-                    elif export_format == "Parquet":
-                        compression_arg = None if compression == "none" else compression
-                        raw_df.to_parquet(
-                            buffer,
-                            compression=compression_arg
-                        )
-
-                        file_extension = "parquet"
-                        mime_type = "application/octet-stream"
-
-                    elif export_format == "HTML":
-                        html_content = raw_df.to_html(index=False)
-                        buffer.write(html_content.encode())
-
-                        file_extension = "html"
-                        mime_type = "text/html"
-
-                    # Preparar botão de download
-                    buffer.seek(0)
+                    result = export_frame(source, export_format, **options)
 
                     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 
                     st.download_button(
                         label=f"Baixar arquivo {export_format}",
-                        data=buffer,
-                        file_name=f"dados_processados_{timestamp}.{file_extension}",
-                        mime=mime_type
+                        data=result.read(),
+                        file_name=f"dados_processados_{timestamp}.{result.file_extension}",
+                        mime=result.mime_type
                     )
 
+                    os.remove(result.path)
+
                     st.success(
                         f"Dados prontos para download como {export_format}!")
 
+                    if result.peak_mb is not None:
+                        st.caption(
+                            f"{result.rows} linhas exportadas em {result.seconds:.1f}s · "
+                            f"pico de memória {result.peak_mb:.0f} MB (+{result.peak_increase_mb:.0f} MB)"
+                        )
+
                 except Exception as e:
                     st.error(f"Erro ao exportar dados: {str(e)}")
                     st.error(traceback.format_exc())
@@ -505,6 +764,7 @@ class App:
         # Se o arquivo for carregado, exibir dados e opções de análise
         # Pré-visualização de dados
         self.render_data_preview_section()
+        self.render_crawl_metrics_section()
 
         # Seção de análise de dados
         self.render_data_analysis_section()
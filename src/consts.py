@@ -1,3 +1,4 @@
+import os
 from enum import Enum
 
 
@@ -35,3 +36,6 @@ class GlobalState(Enum):
 
     def __ge__(self, other):
         return self.value >= other.value
+
+
+DATA_DIR = os.path.join(os.path.expanduser("~"), ".dm-scraper")
@@ -0,0 +1,274 @@
+from dataclasses import dataclass
+from threading import Event, Thread
+from typing import Optional
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+
+import html
+import json
+import os
+import tempfile
+import time
+
+import polars as pl
+import polars.selectors as cs
+
+EXPORT_BATCH_SIZE = 10_000
+
+export_formats = {
+    "CSV": ("csv", "text/csv"),
+    "Excel": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "JSON": ("json", "application/json"),
+    "JSON Lines": ("jsonl", "application/x-ndjson"),
+    "Parquet": ("parquet", "application/octet-stream"),
+    "HTML": ("html", "text/html"),
+}
+
+
+def get_rss_mb() -> Optional[float]:
+    """Resident memory of this process, or None where it can't be read."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1024 / 1024
+    except ImportError:
+        pass
+
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class PeakMemoryMonitor:
+    """Samples the process RSS in the background while the block runs."""
+
+    def __init__(self, interval: float = 0.02):
+        self.interval = interval
+        self.baseline_mb: Optional[float] = None
+        self.peak_mb: Optional[float] = None
+
+        self._stop = Event()
+        self._thread = Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while not self._stop.is_set():
+            rss = get_rss_mb()
+            if rss is not None:
+                self.peak_mb = max(self.peak_mb or 0, rss)
+            time.sleep(self.interval)
+
+    def __enter__(self):
+        self.baseline_mb = get_rss_mb()
+        self.peak_mb = self.baseline_mb
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+        # memory still held when the block ends counts even if no sample caught it
+        rss = get_rss_mb()
+        if rss is not None:
+            self.peak_mb = max(self.peak_mb or 0, rss)
+
+
+@dataclass
+class ExportResult:
+    path: str
+    file_extension: str
+    mime_type: str
+    rows: int
+    seconds: float
+    baseline_mb: Optional[float]
+    peak_mb: Optional[float]
+
+    @property
+    def peak_increase_mb(self) -> Optional[float]:
+        if self.baseline_mb is None or self.peak_mb is None:
+            return None
+        return self.peak_mb - self.baseline_mb
+
+    def read(self) -> bytes:
+        """Loads the exported file for the download button.
+
+        Streamlit keeps the download in memory, so the read is measured too.
+        """
+        with PeakMemoryMonitor() as monitor, open(self.path, "rb") as f:
+            data = f.read()
+
+        if monitor.peak_mb is not None:
+            self.peak_mb = max(self.peak_mb or 0, monitor.peak_mb)
+
+        return data
+
+
+def join_list_columns(lf: pl.LazyFrame) -> pl.LazyFrame:
+    """Flattens list columns into text for formats without nested values."""
+    list_columns = [name for name, dtype in lf.collect_schema().items()
+                    if isinstance(dtype, pl.List)]
+
+    return lf.with_columns(pl.col(list_columns).list.join(", "))
+
+
+def iter_batches(lf: pl.LazyFrame, batch_size: int = EXPORT_BATCH_SIZE):
+    """Collects the frame one slice at a time."""
+    rows = lf.select(pl.len()).collect().item()
+
+    for offset in range(0, rows, batch_size):
+        yield lf.slice(offset, batch_size).collect()
+
+
+def write_csv(lf: pl.LazyFrame, path: str, *, delimiter: str = ",", encoding: str = "utf-8"):
+    if encoding == "utf-8":
+        lf.sink_csv(path, separator=delimiter)
+        return
+
+    with open(path, "wb") as f:
+        for index, batch in enumerate(iter_batches(lf)):
+            f.write(batch.write_csv(separator=delimiter, include_header=index == 0).encode(
+                encoding, errors="replace"))
+
+
+def write_json(lf: pl.LazyFrame, path: str, *, orient: str = "records", date_format: str = "iso"):
+    """Writes the layouts of pandas' `to_json` one batch at a time."""
+    if date_format == "epoch":
+        lf = lf.with_columns((cs.date() | cs.datetime()).dt.epoch("ms"))
+
+    columns = lf.collect_schema().names()
+
+    def encoded_rows(frame: pl.DataFrame) -> list[str]:
+        return frame.select(pl.struct(pl.all()).struct.json_encode()).to_series().to_list()
+
+    def values(frame: pl.DataFrame) -> list[list]:
+        return [list(json.loads(row).values()) for row in encoded_rows(frame)]
+
+    with open(path, "w", encoding="utf-8") as f:
+        match orient:
+            case "records":
+                f.write("[")
+                for index, batch in enumerate(iter_batches(lf)):
+                    f.write(("," if index else "") + ",".join(encoded_rows(batch)))
+                f.write("]")
+            case "index":
+                f.write("{")
+                offset = 0
+                for batch in iter_batches(lf):
+                    f.write(("," if offset else "") + ",".join(
+                        f'"{offset + i}":{row}' for i, row in enumerate(encoded_rows(batch))))
+                    offset += batch.height
+                f.write("}")
+            case "split":
+                rows = lf.select(pl.len()).collect().item()
+                f.write(f'{{"columns":{json.dumps(columns, ensure_ascii=False)},'
+                        f'"index":{json.dumps(list(range(rows)))},"data":[')
+                for index, batch in enumerate(iter_batches(lf)):
+                    f.write(("," if index else "") + ",".join(
+                        json.dumps(row, ensure_ascii=False) for row in values(batch)))
+                f.write("]}")
+            case "columns":
+                f.write("{")
+                for column_index, column in enumerate(columns):
+                    f.write(("," if column_index else "") +
+                            json.dumps(column, ensure_ascii=False) + ":{")
+                    offset = 0
+                    for batch in iter_batches(lf.select(pl.col(column))):
+                        f.write(("," if offset else "") + ",".join(
+                            f'"{offset + i}":{json.dumps(row[0], ensure_ascii=False)}'
+                            for i, row in enumerate(values(batch))))
+                        offset += batch.height
+                    f.write("}")
+                f.write("}")
+            case _:
+                raise ValueError(f"Unsupported JSON orient: {orient}")
+
+
+def write_excel(lf: pl.LazyFrame, path: str, *, sheet_name: str = "Sheet1", number_formats: Optional[dict[str, str]] = None):
+    number_formats = number_formats or {}
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_name)
+
+    columns = lf.collect_schema().names()
+    sheet.append(columns)
+
+    for batch in iter_batches(lf):
+        for row in batch.iter_rows():
+            cells = []
+            for column, value in zip(columns, row):
+                cell = WriteOnlyCell(sheet, value=value)
+                if column in number_formats:
+                    cell.number_format = number_formats[column]
+                cells.append(cell)
+            sheet.append(cells)
+
+    workbook.save(path)
+
+
+def write_html(lf: pl.LazyFrame, path: str, *, value_formats: Optional[dict[str, str]] = None):
+    value_formats = value_formats or {}
+    columns = lf.collect_schema().names()
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('<table border="1" class="dataframe">\n<thead>\n<tr>')
+        f.writelines(f"<th>{html.escape(c)}</th>" for c in columns)
+        f.write("</tr>\n</thead>\n<tbody>\n")
+
+        for batch in iter_batches(lf):
+            for row in batch.iter_rows():
+                f.write("<tr>")
+                for column, value in zip(columns, row):
+                    if value is not None and column in value_formats:
+                        value = value_formats[column].format(value)
+                    f.write(
+                        f"<td>{html.escape('' if value is None else str(value))}</td>")
+                f.write("</tr>\n")
+
+        f.write("</tbody>\n</table>\n")
+
+
+def export_frame(lf: pl.LazyFrame, export_format: str, *, include_index: bool = False, delimiter: str = ",", encoding: str = "utf-8", sheet_name: str = "Sheet1", compression: str = "snappy", orient: str = "records", date_format: str = "iso", number_formats: Optional[dict[str, str]] = None, value_formats: Optional[dict[str, str]] = None) -> ExportResult:
+    """Writes the frame to a temporary file without building an in-memory copy of the export."""
+    file_extension, mime_type = export_formats[export_format]
+
+    fd, path = tempfile.mkstemp(suffix=f".{file_extension}")
+    os.close(fd)
+
+    if include_index:
+        lf = lf.with_row_index("")
+
+    start = time.perf_counter()
+
+    with PeakMemoryMonitor() as monitor:
+        match export_format:
+            case "CSV":
+                write_csv(join_list_columns(lf), path,
+                          delimiter=delimiter, encoding=encoding)
+            case "Excel":
+                write_excel(join_list_columns(lf), path,
+                            sheet_name=sheet_name, number_formats=number_formats)
+            case "JSON":
+                write_json(lf, path, orient=orient, date_format=date_format)
+            case "JSON Lines":
+                lf.sink_ndjson(path)
+            case "Parquet":
+                lf.sink_parquet(
+                    path, compression="uncompressed" if compression == "none" else compression)
+            case "HTML":
+                write_html(join_list_columns(lf), path,
+                           value_formats=value_formats)
+
+    seconds = time.perf_counter() - start
+    rows = lf.select(pl.len()).collect().item()
+
+    return ExportResult(
+        path=path,
+        file_extension=file_extension,
+        mime_type=mime_type,
+        rows=rows,
+        seconds=seconds,
+        baseline_mb=monitor.baseline_mb,
+        peak_mb=monitor.peak_mb
+    )
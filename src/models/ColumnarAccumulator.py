@@ -0,0 +1,109 @@
+from threading import Lock
+from typing import Any, Optional
+
+import polars as pl
+import pyarrow as pa
+
+from models.FilterIndex import FilterIndex
+from models.RecordBatch import RecordBatch
+
+
+class ColumnarAccumulator:
+    """Append-only columnar store for scraped records.
+
+    Records are buffered into column lists and turned into Arrow record
+    batches every `batch_size` rows. Each batch is converted to Polars once,
+    so building a DataFrame view only concatenates the existing chunks and
+    the data is rechunked a single time, in `finish`.
+
+    `categorical` columns are stored as `pl.Categorical` on the global string
+    cache, and `index` is kept up to date with every appended batch.
+    """
+
+    def __init__(self, schema: pa.Schema, batch_size: int = 1024, categorical: Optional[list[str]] = None, index: Optional[FilterIndex] = None):
+        self.schema = schema
+        self.batch_size = batch_size
+        self.categorical = categorical or []
+        self.index = index
+
+        if self.categorical:
+            # chunks built at different times must share category codes
+            pl.enable_string_cache()
+
+        self._lock = Lock()
+        self._buffer: dict[str, list[Any]] = {
+            name: [] for name in schema.names}
+        self._buffered = 0
+        self._chunks: list[pl.DataFrame] = []
+        self._rows = 0
+
+    def _flush(self):
+        if self._buffered == 0:
+            return
+
+        batch = pa.RecordBatch.from_pydict(self._buffer, schema=self.schema)
+        self._chunks.append(self._to_chunk(pl.from_arrow(batch, rechunk=False)))
+
+        self._buffer = {name: [] for name in self.schema.names}
+        self._buffered = 0
+
+    def _to_chunk(self, df: pl.DataFrame) -> pl.DataFrame:
+        return df.select(self.schema.names).with_columns(
+            pl.col(self.categorical).cast(pl.Categorical)
+        )
+
+    def append(self, records: RecordBatch | list[Any]):
+        if isinstance(records, RecordBatch):
+            self.append_batch(records)
+            return
+
+        if self.index is not None:
+            self.index.update(records)
+
+        with self._lock:
+            for record in records:
+                for name, column in self._buffer.items():
+                    column.append(getattr(record, name))
+
+                self._buffered += 1
+                self._rows += 1
+
+                if self._buffered >= self.batch_size:
+                    self._flush()
+
+    def append_batch(self, batch: RecordBatch):
+        if len(batch) == 0:
+            return
+
+        if self.index is not None:
+            self.index.update_columns(batch.columns)
+
+        with self._lock:
+            for name, column in self._buffer.items():
+                column.extend(batch.columns[name])
+
+            self._buffered += len(batch)
+            self._rows += len(batch)
+
+            if self._buffered >= self.batch_size:
+                self._flush()
+
+    def rows(self) -> int:
+        return self._rows
+
+    def to_polars(self) -> pl.DataFrame:
+        with self._lock:
+            self._flush()
+
+            if not self._chunks:
+                return self._to_chunk(pl.from_arrow(self.schema.empty_table()))
+
+            return pl.concat(self._chunks, rechunk=False)
+
+    def finish(self) -> pl.DataFrame:
+        df = self.to_polars().rechunk()
+
+        with self._lock:
+            self._chunks = [df]
+
+        return df
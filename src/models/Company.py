@@ -1,8 +1,9 @@
-from dataclasses import dataclass, field
-from typing import Optional
+from dataclasses import dataclass
 
+import pyarrow as pa
 
-@dataclass
+
+@dataclass(slots=True)
 class Company:
     name: str
     rating: float | None
@@ -23,3 +24,15 @@ company_column_map = {
     "is_open": "Aberto",
     "company_url": "URL da Empresa",
 }
+
+company_schema = pa.schema([
+    ("name", pa.string()),
+    ("rating", pa.float64()),
+    ("banners", pa.list_(pa.string())),
+    ("city", pa.string()),
+    ("is_closed", pa.bool_()),
+    ("company_url", pa.string()),
+    ("image_url", pa.string()),
+])
+
+company_categorical_columns = ["city"]
@@ -1,24 +1,102 @@
-from dataclasses import dataclass
-from typing import Optional
+from collections import Counter
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any, Optional
 
 import polars as pl
 
+from models.RecordBatch import RecordBatch
+
+
+def estimate_value_bytes(value: Any) -> int:
+    """Rough Arrow size of a value: string bytes plus offsets, 8 bytes per number."""
+    match value:
+        case None:
+            return 0
+        case bool():
+            return 1
+        case int() | float():
+            return 8
+        case str():
+            return len(value.encode()) + 4
+        case list():
+            return 4 + sum(estimate_value_bytes(v) for v in value)
+    return 0
+
+
+def estimate_column_bytes(column: list[Any]) -> int:
+    return sum(estimate_value_bytes(v) for v in column)
+
 
 @dataclass
 class DfInfo:
+    """Running statistics of the scraped products.
+
+    `update` and `update_frame` fold each new batch into the counters, so
+    reading them never scans the whole frame. `recompute` rebuilds them from
+    `df` with a full scan.
+    """
     df: Optional[pl.DataFrame] = None
+    row_count: int = 0
+    estimated_bytes: int = 0
+    city_counts: Counter = field(default_factory=Counter)
+    category_counts: Counter = field(default_factory=Counter)
+    companies: set[str] = field(default_factory=set)
+
+    def __post_init__(self):
+        self._lock = Lock()
+
+        if self.df is not None:
+            self.recompute()
+
+    def update(self, batch: RecordBatch):
+        columns = batch.columns
+
+        with self._lock:
+            self.row_count += len(batch)
+            self.estimated_bytes += sum(
+                estimate_column_bytes(column) for column in columns.values())
+            self.city_counts.update(columns["city"])
+            self.category_counts.update(columns["category"])
+            self.companies.update(columns["company_name"])
+
+    def update_frame(self, df: pl.DataFrame):
+        if df.is_empty():
+            return
+
+        city_counts = df.group_by("city").len().iter_rows()
+        category_counts = df.group_by("category").len().iter_rows()
+        companies = df.get_column("company_name").unique().to_list()
+
+        with self._lock:
+            self.row_count += df.height
+            self.estimated_bytes += df.estimated_size()
+            self.city_counts.update(dict(city_counts))
+            self.category_counts.update(dict(category_counts))
+            self.companies.update(companies)
+
+    def recompute(self):
+        with self._lock:
+            self.row_count = 0
+            self.estimated_bytes = 0
+            self.city_counts = Counter()
+            self.category_counts = Counter()
+            self.companies = set()
+
+        if self.df is not None:
+            self.update_frame(self.df)
 
     def has_data(self):
-        return self.df is not None and not self.df.is_empty()
+        return self.row_count > 0
 
     def rows(self):
-        return self.df.shape[0] if self.has_data() else 0
+        return self.row_count
 
     def cities_visited(self):
-        return self.df.select(pl.col('city').unique().len()).item() if self.has_data() else 0
+        return len(self.city_counts)
 
     def company_visited(self):
-        return self.df.select(pl.col('company_name').unique().len()).item() if self.has_data() else 0
+        return len(self.companies)
 
     def memory_usage(self):
-        return self.df.estimated_size('mb') if self.has_data() else 0
+        return self.estimated_bytes / 1024 / 1024
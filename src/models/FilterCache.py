@@ -0,0 +1,61 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Hashable
+
+import polars as pl
+
+
+def freeze_filters(filters: dict) -> tuple:
+    """Hashable, order-independent form of a filter dict."""
+    return tuple(sorted(
+        (column, tuple(value) if isinstance(value, list) else value)
+        for column, value in filters.items()
+    ))
+
+
+class FilterCache:
+    """LRU cache of filtered frames, bounded by entry count and memory.
+
+    Keys should include the dataset version, so results from a previous
+    crawl are never served for a new one.
+    """
+
+    def __init__(self, max_entries: int = 32, max_mb: float = 256):
+        self.max_entries = max_entries
+        self.max_mb = max_mb
+
+        self._lock = Lock()
+        self._entries: OrderedDict[Hashable, tuple[pl.DataFrame, float]] = OrderedDict()
+        self._size_mb = 0.0
+
+        self.hits = 0
+        self.misses = 0
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._size_mb > self.max_mb):
+            _, (_, size) = self._entries.popitem(last=False)
+            self._size_mb -= size
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], pl.DataFrame]) -> pl.DataFrame:
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key][0]
+
+        self.misses += 1
+        df = compute()
+        size = df.estimated_size("mb")
+
+        with self._lock:
+            if key not in self._entries and size <= self.max_mb:
+                self._entries[key] = (df, size)
+                self._size_mb += size
+                self._evict()
+
+        return df
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size_mb = 0.0
@@ -0,0 +1,88 @@
+from math import ceil, floor
+from threading import Lock
+from typing import Any, Iterable, Optional
+
+import polars as pl
+
+
+class FilterIndex:
+    """Distinct values and value ranges of the filterable columns.
+
+    Updated batch by batch as rows are scraped, so the filter widgets don't
+    have to scan the whole frame on every rerun.
+    """
+
+    def __init__(self, value_columns: list[str], range_columns: Optional[list[str]] = None, list_columns: Optional[list[str]] = None):
+        self.value_columns = value_columns
+        self.range_columns = range_columns or []
+        self.list_columns = list_columns or []
+
+        self._lock = Lock()
+        self._values: dict[str, set] = {
+            c: set() for c in value_columns + self.list_columns}
+        self._sorted: dict[str, list] = {}
+        self._ranges: dict[str, tuple[float, float]] = {}
+
+    def _add_values(self, column: str, values: Iterable[Any]):
+        known = self._values[column]
+        size = len(known)
+        known.update(v for v in values if v is not None)
+
+        if len(known) != size:
+            self._sorted.pop(column, None)
+
+    def _add_range(self, column: str, low: float | None, high: float | None):
+        if low is None or high is None:
+            return
+
+        current = self._ranges.get(column)
+        if current is not None:
+            low, high = min(low, current[0]), max(high, current[1])
+
+        self._ranges[column] = (low, high)
+
+    def update(self, records: list[Any]):
+        self.update_columns({
+            column: [getattr(r, column) for r in records]
+            for column in self.value_columns + self.list_columns + self.range_columns
+        })
+
+    def update_columns(self, columns: dict[str, list[Any]]):
+        with self._lock:
+            for column in self.value_columns:
+                self._add_values(column, columns[column])
+
+            for column in self.list_columns:
+                self._add_values(
+                    column, (v for values in columns[column] for v in values or []))
+
+            for column in self.range_columns:
+                values = [v for v in columns[column] if v is not None]
+                if values:
+                    self._add_range(column, min(values), max(values))
+
+    def update_frame(self, df: pl.DataFrame):
+        if df.is_empty():
+            return
+
+        with self._lock:
+            for column in self.value_columns:
+                self._add_values(column, df[column].unique().to_list())
+
+            for column in self.list_columns:
+                self._add_values(
+                    column, df[column].explode().unique().to_list())
+
+            for column in self.range_columns:
+                self._add_range(column, df[column].min(), df[column].max())
+
+    def values(self, column: str) -> list:
+        with self._lock:
+            if column not in self._sorted:
+                self._sorted[column] = sorted(self._values[column], key=str)
+            return self._sorted[column]
+
+    def range(self, column: str) -> tuple[float, float]:
+        """Range of the column widened to whole numbers, (0, 0) when empty."""
+        low, high = self._ranges.get(column, (0, 0))
+        return float(floor(low)), float(ceil(high))
@@ -1,8 +1,12 @@
 from dataclasses import dataclass
 from typing import Optional
 
+import pyarrow as pa
 
-@dataclass
+from models.RecordBatch import RecordBatch
+
+
+@dataclass(slots=True)
 class Product:
     # product info
     name: str
@@ -45,3 +49,26 @@ product_column_map = {
     "city": "Cidade",
     "image_url": "URL da Imagem"
 }
+
+product_schema = pa.schema([
+    ("name", pa.string()),
+    ("original_price", pa.float64()),
+    ("final_price", pa.float64()),
+    ("category", pa.string()),
+    ("company_name", pa.string()),
+    ("is_closed", pa.bool_()),
+    ("city", pa.string()),
+    ("company_url", pa.string()),
+    ("image_url", pa.string()),
+])
+
+product_categorical_columns = ["city", "category", "company_name"]
+
+
+class ProductBatch(RecordBatch):
+    schema = product_schema
+
+    def add(self, **values):
+        if values.get("final_price") is None:
+            values["final_price"] = values.get("original_price")
+        super().add(**values)
@@ -0,0 +1,39 @@
+from typing import Any
+
+import pyarrow as pa
+
+
+class RecordBatch:
+    """Struct-of-arrays batch of records: one Python list per column.
+
+    Scrapers append values straight into the columns, so no object is kept
+    per row, and the accumulator hands the lists over to Arrow as is.
+    Subclasses set `schema`.
+    """
+
+    schema: pa.Schema
+
+    def __init__(self):
+        self.columns: dict[str, list[Any]] = {
+            name: [] for name in self.schema.names}
+
+    def add(self, **values):
+        for name, column in self.columns.items():
+            column.append(values.get(name))
+
+    def append(self, record: Any):
+        for name, column in self.columns.items():
+            column.append(getattr(record, name))
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values())))
+
+    def to_dicts(self) -> list[dict]:
+        return [dict(zip(self.columns, values)) for values in zip(*self.columns.values())]
+
+    @classmethod
+    def from_dicts(cls, rows: list[dict]) -> "RecordBatch":
+        batch = cls()
+        for row in rows:
+            batch.add(**row)
+        return batch
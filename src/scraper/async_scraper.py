@@ -0,0 +1,427 @@
+"""Store engine that drives many Chrome tabs from one asyncio event loop.
+
+The city search and the store listing still go through Selenium. The stores
+are then visited in up to `max_tabs` tabs of the same browser at once,
+talking to Chrome directly over the DevTools protocol:
+
+    opts = {"engine": ENGINE_ASYNC, "max_tabs": 16}
+    AsyncDMScraper().scrape_city("FLORIANOPOLIS", opts=opts, callback=callback)
+"""
+from contextlib import nullcontext
+from typing import Any, Callable, Optional
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.chrome.webdriver import WebDriver
+from tornado.websocket import websocket_connect
+
+from models.Company import Company
+
+from scraper.dm_scraper import DMScraper
+from scraper.driver_pool import browser_profile_from_opts
+from scraper.exceptions import DriverLostException
+from scraper.fetchers import FETCHER_HTTP
+from scraper.snapshot import STORE_SNAPSHOT_SCRIPT, parse_store_snapshot
+from scraper.scheduler import CityTask, StoreScheduler
+from scraper.throttle import StoreTask
+from scraper.waits import WaitStats
+
+import asyncio
+import itertools
+import json
+import time
+import traceback
+import urllib.request
+
+ENGINE_SELENIUM = "selenium"
+ENGINE_ASYNC = "async"
+
+DEFAULT_MAX_TABS = 8
+SCHEDULER_POLL_INTERVAL = 0.05
+
+# set on the page being left, so a tab never mistakes it for the next store
+STALE_MARKER = "window.__dmStale = true"
+STORE_PAGE_READY = "!window.__dmStale && document.getElementsByClassName('company__name').length > 0"
+PRODUCT_CARDS_READY = "document.getElementsByClassName('product-card').length > 0"
+JS_HEAP_MB = "performance.memory ? performance.memory.usedJSHeapSize / 1048576 : null"
+
+
+class CDPException(Exception):
+    pass
+
+
+def browser_websocket_url(driver: WebDriver) -> str:
+    """DevTools endpoint of the browser behind a Selenium Chrome driver."""
+    address = driver.capabilities["goog:chromeOptions"]["debuggerAddress"]
+
+    with urllib.request.urlopen(f"http://{address}/json/version", timeout=10) as response:
+        return json.load(response)["webSocketDebuggerUrl"]
+
+
+class CDPConnection:
+    """Minimal DevTools client: one browser websocket, one flat session per tab."""
+
+    def __init__(self, url: str):
+        self.url = url
+        self._ids = itertools.count(1)
+        self._pending: dict[int, asyncio.Future] = {}
+        self._socket = None
+        self._reader: Optional[asyncio.Task] = None
+
+    async def connect(self):
+        self._socket = await websocket_connect(self.url, max_message_size=256 * 1024 * 1024)
+        self._reader = asyncio.create_task(self._read())
+        return self
+
+    async def _read(self):
+        while True:
+            message = await self._socket.read_message()
+
+            if message is None:
+                for future in self._pending.values():
+                    if not future.done():
+                        future.set_exception(
+                            CDPException("DevTools connection closed"))
+                self._pending.clear()
+                return
+
+            data = json.loads(message)
+
+            # events carry no id and are not needed
+            future = self._pending.pop(data.get("id"), None)
+            if future is None or future.done():
+                continue
+
+            if "error" in data:
+                future.set_exception(CDPException(
+                    data["error"].get("message")))
+            else:
+                future.set_result(data.get("result", {}))
+
+    @property
+    def closed(self) -> bool:
+        return self._reader is not None and self._reader.done()
+
+    async def send(self, method: str, params: Optional[dict] = None, session_id: Optional[str] = None) -> dict:
+        if self.closed:
+            raise CDPException("DevTools connection closed")
+
+        message_id = next(self._ids)
+        message = {"id": message_id, "method": method, "params": params or {}}
+        if session_id:
+            message["sessionId"] = session_id
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[message_id] = future
+
+        await self._socket.write_message(json.dumps(message))
+        return await future
+
+    async def close(self):
+        if self._socket is not None:
+            self._socket.close()
+        if self._reader is not None:
+            await asyncio.gather(self._reader, return_exceptions=True)
+
+
+class Tab:
+    def __init__(self, connection: CDPConnection, target_id: str, session_id: str):
+        self.connection = connection
+        self.target_id = target_id
+        self.session_id = session_id
+
+    @classmethod
+    async def open(cls, connection: CDPConnection, blocked_urls: Optional[list[str]] = None) -> "Tab":
+        target = await connection.send("Target.createTarget", {"url": "about:blank"})
+        session = await connection.send(
+            "Target.attachToTarget", {"targetId": target["targetId"], "flatten": True})
+
+        tab = cls(connection, target["targetId"], session["sessionId"])
+
+        if blocked_urls:
+            await tab.send("Network.enable")
+            await tab.send("Network.setBlockedURLs", {"urls": blocked_urls})
+
+        return tab
+
+    async def send(self, method: str, params: Optional[dict] = None) -> dict:
+        return await self.connection.send(method, params, self.session_id)
+
+    async def evaluate(self, expression: str) -> Any:
+        result = await self.send("Runtime.evaluate", {"expression": expression, "returnByValue": True})
+
+        if "exceptionDetails" in result:
+            raise CDPException(result["exceptionDetails"].get("text"))
+
+        return result["result"].get("value")
+
+    async def navigate(self, url: str):
+        await self.evaluate(STALE_MARKER)
+        result = await self.send("Page.navigate", {"url": url})
+
+        if result.get("errorText"):
+            raise CDPException(f"{url}: {result['errorText']}")
+
+    async def wait_for(self, expression: str, timeout: float, poll_interval: float, stats: Optional[WaitStats] = None, label: Optional[str] = None):
+        """Polls the expression until it is truthy, like `AdaptiveWait.until`."""
+        start = time.perf_counter()
+
+        while True:
+            try:
+                if await self.evaluate(expression):
+                    break
+            except CDPException:
+                # the document is being replaced mid navigation
+                pass
+
+            if time.perf_counter() - start >= timeout:
+                if stats is not None:
+                    stats.record(label or expression, timeout, True)
+                raise TimeoutException(f"Timed out waiting for {label or expression}")
+
+            await asyncio.sleep(poll_interval)
+
+        if stats is not None:
+            stats.record(label or expression, time.perf_counter() - start, False)
+
+    async def close(self):
+        await self.connection.send("Target.closeTarget", {"targetId": self.target_id})
+
+    async def close_quietly(self):
+        try:
+            await self.close()
+        except CDPException:
+            pass
+
+
+class AsyncDMScraper(DMScraper):
+    """DMScraper whose store phase runs in concurrent tabs of one browser.
+
+    Only snapshot extraction is available, since the tabs are not Selenium
+    windows. `max_tabs` in the options limits the tabs open at once.
+    """
+
+    def scrape_store_list(self, stores: list[Company], *, opts: dict, callback: Optional[Callable] = None):
+        # plain HTTP fetches don't need tabs
+        if self.fetcher_name == FETCHER_HTTP:
+            return super().scrape_store_list(stores, opts=opts, callback=callback)
+
+        # tabs opened over CDP don't inherit the driver's URL blocking
+        profile = self.driver_pool.profile if self.driver_pool else browser_profile_from_opts(opts)
+
+        asyncio.run(self.crawl_stores(
+            stores, opts.get("max_tabs", DEFAULT_MAX_TABS), profile.blocked_urls, callback))
+
+    async def crawl_stores(self, stores: list[Company], max_tabs: int, blocked_urls: list[str], callback: Optional[Callable] = None):
+        url = await asyncio.to_thread(browser_websocket_url, self.driver)
+        connection = await CDPConnection(url).connect()
+
+        queue: asyncio.Queue[StoreTask] = asyncio.Queue()
+        for company_info in stores:
+            queue.put_nowait(StoreTask(company_info))
+
+        try:
+            await asyncio.gather(*(
+                self.tab_worker(connection, queue, blocked_urls, callback)
+                for _ in range(min(max_tabs, len(stores)))
+            ))
+        finally:
+            await connection.close()
+
+    async def tab_worker(self, connection: CDPConnection, queue: asyncio.Queue, blocked_urls: list[str], callback: Optional[Callable] = None):
+        tab = await Tab.open(connection, blocked_urls)
+
+        try:
+            while True:
+                try:
+                    task: StoreTask = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+
+                await asyncio.sleep(task.delay())
+
+                _, retry = await self.scrape_store_task_in_tab(tab, task, callback)
+                if retry:
+                    queue.put_nowait(retry)
+        finally:
+            await tab.close_quietly()
+
+    async def scrape_store_task_in_tab(self, tab: Tab, task: StoreTask, callback: Optional[Callable] = None) -> tuple[bool, Optional[StoreTask]]:
+        """Async counterpart of `DMScraper.scrape_store_task`."""
+        company_info = task.company_info
+
+        try:
+            await self.scrape_store_in_tab(tab, company_info, callback)
+            return True, None
+        except (TimeoutException, CDPException) as e:
+            if await asyncio.to_thread(self.driver_lost):
+                raise DriverLostException(
+                    f"[{self.city}] Browser lost on {company_info.name}") from e
+
+            retry = self.throttle.retry(task) if self.throttle else None
+
+            if retry:
+                print(
+                    f"[{self.city}] {type(e).__name__} on {company_info.name}, retrying in {retry.delay():.1f}s")
+
+                if self.metrics:
+                    self.metrics.record_retry(self.city_query)
+            else:
+                print(
+                    f"[{self.city}] {type(e).__name__} on {company_info.name}")
+
+            if self.metrics and isinstance(e, TimeoutException):
+                self.metrics.record_timeout(self.city_query)
+            elif self.metrics:
+                self.metrics.record_error(self.city_query)
+
+            return False, retry
+        except Exception as e:
+            if await asyncio.to_thread(self.driver_lost):
+                raise DriverLostException(
+                    f"[{self.city}] Browser lost on {company_info.name}") from e
+
+            print(traceback.format_exc())
+
+            if self.metrics:
+                self.metrics.record_error(self.city_query)
+
+        return False, None
+
+    def work(self, scheduler: StoreScheduler, *, opts: dict, callback: Optional[Callable] = None):
+        self.configure(opts)
+
+        if self.fetcher_name == FETCHER_HTTP:
+            return super().work(scheduler, opts=opts, callback=callback)
+
+        # the tabs of every city share one browser, so it is only replaced
+        # when it dies; its in-flight tasks are requeued by the tab workers.
+        # The tabs only take tasks once the browser is up, so one that fails
+        # to start leaves no task in flight
+        while not scheduler.done:
+            driver = self.driver_pool.acquire()
+            self.driver = driver
+            lost = False
+
+            try:
+                lost = asyncio.run(self.work_in_tabs(
+                    scheduler, opts, opts.get("max_tabs", DEFAULT_MAX_TABS), callback))
+            finally:
+                self.driver = None
+                self.driver_pool.release(driver, discard=lost)
+
+    async def work_in_tabs(self, scheduler: StoreScheduler, opts: dict, max_tabs: int, callback: Optional[Callable] = None) -> bool:
+        """Runs the scheduler's tasks in tabs until the crawl is done; True if the browser died."""
+        url = await asyncio.to_thread(browser_websocket_url, self.driver)
+        connection = await CDPConnection(url).connect()
+
+        # listings run on the Selenium tab, one at a time
+        listing_lock = asyncio.Lock()
+        lost = asyncio.Event()
+        blocked_urls = self.driver_pool.profile.blocked_urls
+
+        try:
+            # every tab finishes its task before returning, even when
+            # another one fails, so no task is left in flight
+            results = await asyncio.gather(*(
+                self.scheduled_tab_worker(
+                    connection, scheduler, listing_lock, lost, blocked_urls, opts, callback)
+                for _ in range(max_tabs)
+            ), return_exceptions=True)
+        finally:
+            await connection.close()
+
+        errors = [r for r in results if isinstance(r, BaseException)]
+        if errors and not lost.is_set():
+            if await asyncio.to_thread(self.driver_lost):
+                return True
+            raise errors[0]
+
+        return lost.is_set()
+
+    async def scheduled_tab_worker(self, connection: CDPConnection, scheduler: StoreScheduler, listing_lock: asyncio.Lock, lost: asyncio.Event, blocked_urls: list[str], opts: dict, callback: Optional[Callable] = None):
+        tab = await Tab.open(connection, blocked_urls)
+
+        try:
+            while not lost.is_set():
+                task = scheduler.try_get()
+
+                if task is None:
+                    if scheduler.done:
+                        return
+                    await asyncio.sleep(SCHEDULER_POLL_INTERVAL)
+                    continue
+
+                try:
+                    if isinstance(task, CityTask):
+                        async with listing_lock:
+                            await asyncio.to_thread(self.run_city_task, scheduler, task, opts)
+                        continue
+
+                    ok, retry = await self.task_scraper(task).scrape_store_task_in_tab(tab, task, callback)
+                except DriverLostException as e:
+                    print(f"{e}, starting a new browser")
+                    lost.set()
+                    self.requeue_lost_task(scheduler, task)
+                    return
+
+                if retry:
+                    scheduler.requeue(task, retry)
+                elif ok:
+                    scheduler.task_done(task)
+                else:
+                    scheduler.task_failed(task)
+        finally:
+            await tab.close_quietly()
+
+    async def scrape_store_in_tab(self, tab: Tab, company_info: Company, callback: Optional[Callable] = None):
+        # the cache, the journal and the callbacks block on disk or locks, so
+        # they run off the event loop like the listings do
+        if await asyncio.to_thread(self.scrape_cached_store, company_info, callback) is not None:
+            return
+
+        async with self.throttle.request_async(company_info.company_url) if self.throttle else nullcontext():
+            start = time.perf_counter()
+            await tab.navigate(company_info.company_url)
+            await tab.wait_for(STORE_PAGE_READY, self.wait_timeout, self.wait_poll_interval,
+                               self.wait_stats, label="store page")
+
+            try:
+                await tab.wait_for(PRODUCT_CARDS_READY, 5, self.wait_poll_interval,
+                                   self.wait_stats, label="product cards")
+            except TimeoutException:
+                print(f"[{self.city}] No products on {company_info.name}")
+
+            if self.recorder:
+                await asyncio.to_thread(
+                    self.recorder.record_html,
+                    await tab.evaluate("document.URL"),
+                    await tab.evaluate("document.documentElement.outerHTML")
+                )
+
+            snapshot = await tab.evaluate(f"(() => {{{STORE_SNAPSHOT_SCRIPT}}})()")
+            page_load = time.perf_counter() - start
+
+        company_products = parse_store_snapshot(
+            snapshot, company_info, self.city)
+
+        if callback:
+            await asyncio.to_thread(callback, company_data=company_info)
+
+        await asyncio.to_thread(self.store_scraped, company_info,
+                                company_products, page_load, callback)
+
+        if self.metrics:
+            heap_mb = await tab.evaluate(JS_HEAP_MB)
+            if heap_mb is not None:
+                self.metrics.record_driver_memory(tab.target_id, heap_mb)
+
+
+def scraper_class_from_opts(opts: dict) -> type[DMScraper]:
+    return AsyncDMScraper if opts.get("engine") == ENGINE_ASYNC else DMScraper
+
+
+def store_concurrency_from_opts(opts: dict) -> int:
+    """Store requests one scraper can have in flight at once."""
+    if opts.get("engine") == ENGINE_ASYNC and opts.get("fetcher") != FETCHER_HTTP:
+        return opts.get("max_tabs", DEFAULT_MAX_TABS)
+    return opts.get("store_workers", 1)
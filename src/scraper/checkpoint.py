@@ -0,0 +1,145 @@
+from dataclasses import asdict
+from threading import Lock
+from typing import Iterator, Optional
+
+from models.Product import ProductBatch
+from models.Company import Company
+
+from consts import DATA_DIR
+
+import hashlib
+import json
+import os
+import time
+
+DEFAULT_CHECKPOINT_DIR = os.path.join(DATA_DIR, "checkpoints")
+DEFAULT_MAX_AGE = 24 * 60 * 60
+
+
+class CrawlJournal:
+    """Append-only checkpoint of a crawl over a list of cities.
+
+    Every finished store is written with its rows, and every finished city
+    is marked as done. A new crawl over the same city list picks the journal
+    up and only visits what is missing. Only the store URLs are kept in
+    memory; the rows are read back from the file by `replay`.
+
+    A journal started more than `max_age` seconds ago is dropped, so its
+    rows are never older than the crawl cache would allow.
+    """
+
+    def __init__(self, cities: list[str], directory: str = DEFAULT_CHECKPOINT_DIR, max_age: float = DEFAULT_MAX_AGE):
+        key = hashlib.sha1(json.dumps(
+            sorted(cities)).encode()).hexdigest()[:16]
+
+        os.makedirs(directory, exist_ok=True)
+
+        self.cities = list(cities)
+        self.path = os.path.join(directory, f"{key}.jsonl")
+        self.max_age = max_age
+        self.started_at = time.time()
+        self.done_cities: set[str] = set()
+        self.store_urls: set[str] = set()
+
+        self._lock = Lock()
+        truncated = self._load()
+
+        if self.done_cities or self.store_urls:
+            if time.time() - self.started_at > max_age:
+                print(f"Discarding crawl journal from {time.ctime(self.started_at)}")
+                os.remove(self.path)
+                self.started_at = time.time()
+                self.done_cities.clear()
+                self.store_urls.clear()
+                truncated = False
+
+        is_new = not os.path.exists(self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+        if truncated:
+            self._file.write("\n")
+
+        if is_new:
+            self._write({"type": "start", "started_at": self.started_at})
+
+    def _entries(self) -> Iterator[dict]:
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # the last line may be cut short by a crash
+                    continue
+
+    def _load(self) -> bool:
+        """Reads the journal back, returning whether its last line is incomplete."""
+        if not os.path.exists(self.path):
+            return False
+
+        # journals without a start entry are dated by the file itself
+        self.started_at = os.path.getmtime(self.path)
+
+        for entry in self._entries():
+            match entry["type"]:
+                case "start":
+                    self.started_at = entry["started_at"]
+                case "store":
+                    self.store_urls.add(entry["company"]["company_url"])
+                case "city":
+                    self.done_cities.add(entry["city"])
+
+        with open(self.path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                return False
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b"\n"
+
+    def _write(self, entry: dict):
+        with self._lock:
+            self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._file.flush()
+
+    def is_resuming(self) -> bool:
+        return bool(self.store_urls or self.done_cities)
+
+    def replay(self) -> Iterator[tuple[Company, ProductBatch]]:
+        """The stores journaled by earlier runs, read from the file one at a time."""
+        seen = set()
+
+        for entry in self._entries():
+            if entry["type"] != "store":
+                continue
+
+            company = Company(**entry["company"])
+            if company.company_url in seen:
+                continue
+            seen.add(company.company_url)
+
+            yield company, ProductBatch.from_dicts(entry["products"])
+
+    def is_city_done(self, city_query: str) -> bool:
+        return city_query in self.done_cities
+
+    def is_store_done(self, company_url: Optional[str]) -> bool:
+        return company_url in self.store_urls
+
+    def record_store(self, company: Company, products: ProductBatch):
+        self.store_urls.add(company.company_url)
+        self._write({
+            "type": "store",
+            "company": asdict(company),
+            "products": products.to_dicts(),
+        })
+
+    def record_city(self, city_query: str):
+        self.done_cities.add(city_query)
+        self._write({"type": "city", "city": city_query})
+
+    def close(self):
+        """Closes the journal, removing it once every city is done."""
+        with self._lock:
+            self._file.close()
+
+        if all(city in self.done_cities for city in self.cities):
+            os.remove(self.path)
@@ -0,0 +1,121 @@
+from dataclasses import dataclass
+from threading import Lock
+from typing import Optional
+
+from consts import DATA_DIR
+
+import os
+import sqlite3
+import time
+
+DEFAULT_CITY_CACHE_PATH = os.path.join(DATA_DIR, "city_cache.sqlite")
+DEFAULT_CITY_TTL = 30 * 24 * 60 * 60
+
+
+def normalize_city_query(city_query: str) -> str:
+    return " ".join(city_query.split()).upper()
+
+
+@dataclass
+class CityEntry:
+    query: str
+    title: str
+    url: str
+    resolved_at: float
+
+
+def find_city(entries: list[CityEntry], text: str) -> Optional[CityEntry]:
+    """The entry matching a city query or its canonical title."""
+    text = normalize_city_query(text)
+    return next((e for e in entries if e.query == text), None) or \
+        next((e for e in entries if normalize_city_query(e.title) == text), None)
+
+
+class CityCache:
+    """Persistent map from a city query to the landing page it resolved to.
+
+    A cached city is opened straight from its URL instead of going through
+    the search box and its autocomplete. Entries older than `ttl` seconds
+    are resolved again.
+    """
+
+    def __init__(self, path: str = DEFAULT_CITY_CACHE_PATH, ttl: float = DEFAULT_CITY_TTL):
+        self.path = path
+        self.ttl = ttl
+
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        self._lock = Lock()
+        self._connection = sqlite3.connect(
+            path, check_same_thread=False, timeout=30)
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS cities (
+                query TEXT PRIMARY KEY,
+                title TEXT NOT NULL,
+                url TEXT NOT NULL,
+                resolved_at REAL NOT NULL
+            )
+        """)
+        self._connection.commit()
+
+    def get(self, city_query: str) -> Optional[CityEntry]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT query, title, url, resolved_at FROM cities WHERE query = ? AND resolved_at >= ?",
+                (normalize_city_query(city_query), time.time() - self.ttl)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+
+        return CityEntry(*row)
+
+    def entries(self) -> list[CityEntry]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT query, title, url, resolved_at FROM cities WHERE resolved_at >= ? ORDER BY title",
+                (time.time() - self.ttl,)
+            ).fetchall()
+
+        return [CityEntry(*row) for row in rows]
+
+    def put(self, city_query: str, title: str, url: str):
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO cities VALUES (?, ?, ?, ?)",
+                (normalize_city_query(city_query), title, url, time.time())
+            )
+            self._connection.commit()
+
+    def invalidate(self, city_query: str):
+        with self._lock:
+            self._connection.execute(
+                "DELETE FROM cities WHERE query = ?", (normalize_city_query(city_query),))
+            self._connection.commit()
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self.entries()),
+        }
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+def city_cache_from_opts(opts: dict) -> Optional[CityCache]:
+    if not opts.get("use_city_cache", True):
+        return None
+
+    return CityCache(
+        path=opts.get("city_cache_path", DEFAULT_CITY_CACHE_PATH),
+        ttl=opts.get("city_cache_ttl", DEFAULT_CITY_TTL)
+    )
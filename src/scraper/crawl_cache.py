@@ -0,0 +1,146 @@
+from dataclasses import asdict
+from threading import Lock
+from typing import Optional
+
+from models.Product import ProductBatch
+from models.Company import Company
+
+from consts import DATA_DIR
+
+import json
+import os
+import sqlite3
+import time
+
+DEFAULT_CACHE_PATH = os.path.join(DATA_DIR, "crawl_cache.sqlite")
+DEFAULT_TTL = 24 * 60 * 60
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+class CrawlCache:
+    """Persistent cache of scraped stores keyed by `company_url`.
+
+    Entries older than `ttl` seconds are stale and get re-scraped. When the
+    cache grows past `max_bytes`, the least recently used stores are evicted.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl: float = DEFAULT_TTL, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        self._lock = Lock()
+        self._connection = sqlite3.connect(
+            path, check_same_thread=False, timeout=30)
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS stores (
+                company_url TEXT PRIMARY KEY,
+                city TEXT,
+                company TEXT NOT NULL,
+                products TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                scraped_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._connection.commit()
+
+    def get(self, company_url: str) -> Optional[tuple[Company, ProductBatch]]:
+        now = time.time()
+
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT company, products, scraped_at FROM stores WHERE company_url = ?",
+                (company_url,)
+            ).fetchone()
+
+            if row is None or now - row[2] > self.ttl:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._connection.execute(
+                "UPDATE stores SET accessed_at = ? WHERE company_url = ?",
+                (now, company_url)
+            )
+            self._connection.commit()
+
+        company = Company(**json.loads(row[0]))
+        products = ProductBatch.from_dicts(json.loads(row[1]))
+        return company, products
+
+    def put(self, company: Company, products: ProductBatch):
+        company_data = json.dumps(asdict(company), ensure_ascii=False)
+        products_data = json.dumps(
+            products.to_dicts(), ensure_ascii=False)
+        now = time.time()
+
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO stores VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    company.company_url,
+                    company.city,
+                    company_data,
+                    products_data,
+                    len(company_data) + len(products_data),
+                    now,
+                    now
+                )
+            )
+            self._evict()
+            self._connection.commit()
+
+    def _evict(self):
+        size = self._connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM stores").fetchone()[0]
+
+        if size <= self.max_bytes:
+            return
+
+        rows = self._connection.execute(
+            "SELECT company_url, size FROM stores ORDER BY accessed_at ASC"
+        ).fetchall()
+
+        for company_url, entry_size in rows:
+            if size <= self.max_bytes:
+                break
+
+            self._connection.execute(
+                "DELETE FROM stores WHERE company_url = ?", (company_url,))
+            size -= entry_size
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = self._connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM stores").fetchone()
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": entries,
+            "size_bytes": size,
+        }
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+def crawl_cache_from_opts(opts: dict) -> Optional[CrawlCache]:
+    if not opts.get("use_cache", True):
+        return None
+
+    return CrawlCache(
+        path=opts.get("cache_path", DEFAULT_CACHE_PATH),
+        ttl=opts.get("cache_ttl", DEFAULT_TTL),
+        max_bytes=opts.get("cache_max_bytes", DEFAULT_MAX_BYTES)
+    )
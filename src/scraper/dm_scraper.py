@@ -2,38 +2,68 @@ from typing import TypeVar, Optional, Callable
 
 from selenium.webdriver.chrome.webdriver import WebDriver
 from selenium.webdriver.remote.webelement import WebElement
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.wait import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
 
-from selenium.common.exceptions import ElementClickInterceptedException, TimeoutException
+from selenium.common.exceptions import TimeoutException, WebDriverException
 
-from models.Product import Product
+from models.Product import Product, ProductBatch
 from models.Company import Company
 
-from utils import get_webdriver_service
+from scraper.checkpoint import CrawlJournal
+from scraper.city_cache import CityCache
+from scraper.crawl_cache import CrawlCache
+from scraper.replay import PageRecorder
+from scraper.telemetry import CrawlMetrics
+from scraper.scheduler import CityTask, StoreScheduler
+from scraper.throttle import CrawlThrottle, StoreTask, DEFAULT_MAX_ATTEMPTS
+from scraper.driver_pool import DriverPool, browser_profile_from_opts, is_driver_alive
+from scraper.exceptions import CityNotFoundException, DriverLostException, FetchException, IgnoreProductException
+from scraper.fetchers import BrowserFetcher, HttpFetcher, FETCHER_BROWSER, FETCHER_HTTP, http_pool_from_opts
 from scraper.scraper_utils import format_price
+from scraper.waits import AdaptiveWait, WaitStats, DEFAULT_TIMEOUT, DEFAULT_POLL_INTERVAL
+from scraper.snapshot import (
+    STORE_SNAPSHOT_SCRIPT,
+    COMPANY_SNAPSHOT_SCRIPT,
+    parse_company_snapshot,
+    parse_store_snapshot,
+)
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import replace
+from queue import Queue, Empty
 
 import time
 import traceback
+import urllib3
 
 T = TypeVar("T")
 
+BASE_URL = "https://www.deliverymuch.com.br/"
 
-class CityNotFoundException(Exception):
-    pass
-
-
-class IgnoreProductException(Exception):
-    pass
+EXTRACTION_MODE_SNAPSHOT = "snapshot"
+EXTRACTION_MODE_ELEMENTS = "elements"
 
 
 class DMScraper:
-    def __init__(self):
+    def __init__(self, driver_pool: Optional[DriverPool] = None, wait_stats: Optional[WaitStats] = None, crawl_cache: Optional[CrawlCache] = None, journal: Optional[CrawlJournal] = None, metrics: Optional[CrawlMetrics] = None, throttle: Optional[CrawlThrottle] = None, city_cache: Optional[CityCache] = None):
         self.city = None
+        self.city_query = None
         self.driver = None
+        self.driver_pool = driver_pool
+        self.wait_stats = wait_stats
+        self.crawl_cache = crawl_cache
+        self.journal = journal
+        self.metrics = metrics
+        self.throttle = throttle
+        self.city_cache = city_cache
+        self.recorder: Optional[PageRecorder] = None
+        self.base_url = BASE_URL
+        self.wait_timeout = DEFAULT_TIMEOUT
+        self.wait_poll_interval = DEFAULT_POLL_INTERVAL
+        self.extraction_mode = EXTRACTION_MODE_SNAPSHOT
+        self.fetcher_name = FETCHER_BROWSER
+        self.http: Optional[urllib3.PoolManager] = None
 
     def attempt_to_find_element(self, driver_or_element: WebDriver | WebElement, by: By, value: str, field: Optional[str] = None) -> WebElement | str | None:
         elements = driver_or_element.find_elements(by, value)
@@ -47,15 +77,41 @@ class DMScraper:
 
         return element
 
-    def wait_for_element(self, by: By, value: str, timeout: float = 20):
-        WebDriverWait(self.driver, timeout).until(
-            EC.presence_of_element_located((by, value))
+    @property
+    def fetcher(self) -> BrowserFetcher | HttpFetcher:
+        if self.fetcher_name == FETCHER_HTTP:
+            return HttpFetcher(self, self.http)
+        return BrowserFetcher(self)
+
+    @property
+    def wait(self) -> AdaptiveWait:
+        return AdaptiveWait(
+            self.driver,
+            timeout=self.wait_timeout,
+            poll_interval=self.wait_poll_interval,
+            stats=self.wait_stats
         )
 
+    def wait_for_element(self, by: By, value: str, timeout: Optional[float] = None):
+        return self.wait.element(by, value, timeout)
+
     def element_exists(self, driver_or_element: WebDriver | WebElement, by: By, value: str):
         return self.attempt_to_find_element(driver_or_element, by, value) is not None
 
     def scrape_company_info(self, company_wrapper: WebElement) -> Company:
+        if self.extraction_mode == EXTRACTION_MODE_SNAPSHOT:
+            try:
+                return parse_company_snapshot(
+                    self.driver.execute_script(
+                        COMPANY_SNAPSHOT_SCRIPT, company_wrapper),
+                    self.city
+                )
+            except WebDriverException:
+                print("Company snapshot failed, falling back to element extraction")
+
+        return self.scrape_company_info_by_element(company_wrapper)
+
+    def scrape_company_info_by_element(self, company_wrapper: WebElement) -> Company:
         company_name = self.attempt_to_find_element(
             company_wrapper,
             By.CLASS_NAME,
@@ -81,10 +137,28 @@ class DMScraper:
         company_is_closed = self.element_exists(
             company_wrapper, By.TAG_NAME, "figcaption")
 
-        company_logo = company_wrapper.find_element(
+        company_logo = self.attempt_to_find_element(
+            company_wrapper,
             By.CSS_SELECTOR,
             ".company__logo > img"
-        ).get_attribute("src")
+        )
+
+        if company_logo:
+            company_logo = company_logo.get_attribute("src")
+
+        # same lookup as `closest('a[href]')` in the snapshot script
+        company_link = self.attempt_to_find_element(
+            company_wrapper,
+            By.XPATH,
+            "ancestor-or-self::a[@href][1]"
+        ) or self.attempt_to_find_element(
+            company_wrapper,
+            By.CSS_SELECTOR,
+            "a[href]"
+        )
+
+        if company_link:
+            company_link = company_link.get_attribute("href")
 
         return Company(
             name=company_name,
@@ -92,8 +166,7 @@ class DMScraper:
             banners=company_badges,
             is_closed=company_is_closed,
             city=self.city,
-            # set after accessing the link
-            company_url=None,
+            company_url=company_link,
             image_url=company_logo
         )
 
@@ -158,163 +231,519 @@ class DMScraper:
             image_url=image_url,
         )
 
-    def scrape_city(self, city_query: str, *, opts: Optional[dict], callback: Optional[Callable[[list[Product]], None]] = None, retry=0):
-        products = []
-        visited_stores = dict()
-        store_index = 0
+    def scrape_store_products(self, company_info: Company) -> ProductBatch:
+        if self.extraction_mode == EXTRACTION_MODE_SNAPSHOT:
+            try:
+                snapshot = self.driver.execute_script(STORE_SNAPSHOT_SCRIPT)
+                return parse_store_snapshot(snapshot, company_info, self.city)
+            except WebDriverException:
+                print(
+                    f"[{self.city}] Snapshot failed on {company_info.name}, falling back to element extraction")
 
-        include_closed_stores = opts.get("include_closed_stores", False)
+        return self.scrape_store_products_by_element(company_info)
 
-        print("Initializing driver")
+    def scrape_store_products_by_element(self, company_info: Company) -> ProductBatch:
+        categories_elements = self.driver.find_elements(
+            By.CLASS_NAME,
+            "product-categories__group"
+        )
 
-        options = Options()
-        options.add_argument('--disable-gpu')
-        options.add_argument("--headless")
+        company_products = ProductBatch()
 
-        service = get_webdriver_service()
-        try:
-            self.driver = webdriver.Chrome(options=options, service=service)
-        except Exception as e:
-            print(e)
+        for c in categories_elements:
+            category = c.find_element(
+                By.CLASS_NAME,
+                "category__title"
+            ).text
 
-        driver = self.driver
-        driver.get("https://www.deliverymuch.com.br/")
+            products_elements = c.find_elements(
+                By.CLASS_NAME,
+                "product-card"
+            )
 
-        self.wait_for_element(By.ID, "city")
+            for product_wrapper in products_elements:
+                try:
+                    product = self.scrape_product_info(
+                        product_wrapper,
+                        company_info,
+                        category
+                    )
 
-        search_input = driver.find_element(By.ID, "city")
+                    company_products.append(product)
+                except IgnoreProductException:
+                    continue
 
-        for c in city_query:
-            search_input.send_keys(c)
-            time.sleep(0.2)
+        return company_products
 
-        try:
-            self.wait_for_element(
-                By.CSS_SELECTOR,
-                "li.cursor-pointer > button",
-                5
-            )
-        except:
-            self.driver.close()
+    def search_city(self, city_query: str, retries: int = 3):
+        driver = self.driver
 
-            if retry > 2:
-                raise CityNotFoundException(
-                    f"{city} not found")
+        for attempt in range(retries):
+            driver.get(self.base_url)
 
-            self.scrape_city(
-                city, opts=opts, callback=callback, retry=retry + 1)
-            return
+            self.wait_for_element(By.ID, "city")
 
-        driver.find_element(
-            By.CSS_SELECTOR,
-            "li.cursor-pointer > button"
-        ).click()
+            driver.find_element(By.ID, "city").send_keys(city_query)
 
-        while True:
             try:
-                self.wait_for_element(By.CLASS_NAME, "company-list__item")
+                self.wait.element(
+                    By.CSS_SELECTOR,
+                    "li.cursor-pointer > button",
+                    5,
+                    label="city autocomplete"
+                )
+            except TimeoutException:
+                print(
+                    f"[{city_query}] City search attempt {attempt + 1} failed")
 
-                city = driver.find_element(
-                    By.CLASS_NAME,
-                    "city-info__title"
-                ).text
+                if self.metrics:
+                    self.metrics.record_retry(city_query)
+                continue
 
-                self.city = city
-            except:
-                break
+            driver.find_element(
+                By.CSS_SELECTOR,
+                "li.cursor-pointer > button"
+            ).click()
+            return
+
+        raise CityNotFoundException(f"{city_query} not found")
 
+    def scrape_city(self, city_query: str, *, opts: Optional[dict], callback: Optional[Callable] = None):
+        owns_pool = self.driver_pool is None
+        driver_pool = DriverPool(
+            max_size=1,
+            profile=browser_profile_from_opts(opts)
+        ) if owns_pool else self.driver_pool
+
+        try:
+            with driver_pool.driver() as driver:
+                self.driver = driver
+                self.crawl_city(city_query, opts=opts, callback=callback)
+        finally:
+            self.driver = None
+            if owns_pool:
+                driver_pool.close()
+
+    def expand_store_list(self, include_closed_stores: bool) -> list[WebElement]:
+        driver = self.driver
+
+        while True:
             elements = driver.find_elements(
                 By.CLASS_NAME,
                 "company-list__item"
             )
 
-            if store_index >= len(elements):
-                button = self.attempt_to_find_element(
-                    driver,
-                    By.XPATH,
-                    '//button[normalize-space()="Carregar mais lojas"]'
+            # closed stores are listed last, so there's nothing left to load
+            if elements and not include_closed_stores and self.scrape_company_info(elements[-1]).is_closed:
+                return elements
+
+            button = self.attempt_to_find_element(
+                driver,
+                By.XPATH,
+                '//button[normalize-space()="Carregar mais lojas"]'
+            )
+
+            if not button:
+                return elements
+
+            button.click()
+
+            try:
+                self.wait.element_count_above(
+                    By.CLASS_NAME,
+                    "company-list__item",
+                    len(elements),
+                    label="load more stores"
                 )
+            except TimeoutException:
+                print(f"[{self.city}] No new stores after loading more")
+                return elements
 
-                if button:
-                    button.click()
-                    store_index = 0
-                    time.sleep(1)
-                    continue
-                else:
-                    break
+    def collect_stores(self, include_closed_stores: bool) -> list[Company]:
+        driver = self.driver
 
-            e = elements[store_index]
-            store_index += 1
+        self.wait_for_element(By.CLASS_NAME, "company-list__item")
 
+        self.city = driver.find_element(
+            By.CLASS_NAME,
+            "city-info__title"
+        ).text
+
+        stores = []
+        visited_stores = set()
+
+        elements = self.expand_store_list(include_closed_stores)
+
+        if self.recorder:
+            self.recorder.record_page(driver)
+
+        for e in elements:
             company_info = self.scrape_company_info(e)
 
             if company_info.is_closed and not include_closed_stores:
                 break
 
-            if company_info.name in visited_stores:
+            if not company_info.company_url:
+                print(
+                    f"[{self.city}] No link found for {company_info.name}, skipping")
+                continue
+
+            if company_info.company_url in visited_stores:
+                continue
+
+            # already scraped before the crawl was interrupted
+            if self.journal and self.journal.is_store_done(company_info.company_url):
                 continue
 
+            visited_stores.add(company_info.company_url)
+            stores.append(company_info)
+
+        return stores
+
+    def scrape_cached_store(self, company_info: Company, callback: Optional[Callable] = None) -> Optional[ProductBatch]:
+        """Emits the store from the crawl cache, or returns None on a miss."""
+        cached = self.crawl_cache.get(
+            company_info.company_url) if self.crawl_cache else None
+
+        if cached is None:
+            return None
+
+        _, company_products = cached
+
+        if self.journal:
+            self.journal.record_store(company_info, company_products)
+
+        if callback:
+            callback(company_data=company_info)
+            callback(product_data=company_products)
+
+        if self.metrics:
+            self.metrics.store_done(
+                self.city_query, len(company_products), cached=True)
+
+        return company_products
+
+    def store_scraped(self, company_info: Company, company_products: ProductBatch, page_load: float, callback: Optional[Callable] = None):
+        if self.crawl_cache:
+            self.crawl_cache.put(company_info, company_products)
+
+        if self.journal:
+            self.journal.record_store(company_info, company_products)
+
+        if callback:
+            callback(product_data=company_products)
+
+        if self.metrics:
+            self.metrics.store_done(
+                self.city_query, len(company_products), page_load)
+
+    def scrape_store(self, company_info: Company, callback: Optional[Callable] = None) -> ProductBatch:
+        cached = self.scrape_cached_store(company_info, callback)
+        if cached is not None:
+            return cached
+
+        fetcher = self.fetcher
+
+        # reading the products is part of the request, so its timeouts count
+        # towards the throttle's error rate
+        with self.throttle.request(company_info.company_url) if self.throttle else nullcontext():
+            start = time.perf_counter()
+            page = fetcher.load(company_info)
+            company_products = fetcher.products(company_info, page)
+            page_load = time.perf_counter() - start
+
+        # emit company dataframe update once the products are read, so a
+        # store that fails and is retried is only emitted once
+        if callback:
+            callback(company_data=company_info)
+
+        self.store_scraped(company_info, company_products, page_load, callback)
+
+        if self.metrics and self.driver is not None:
+            self.record_driver_memory()
+
+        return company_products
+
+    def record_driver_memory(self):
+        try:
+            heap = self.driver.execute_script(
+                "return performance.memory ? performance.memory.usedJSHeapSize : null")
+        except WebDriverException:
+            return
+
+        if heap is not None:
+            self.metrics.record_driver_memory(
+                self.driver.session_id, heap / 1024 / 1024)
+
+    def scrape_store_task(self, task: StoreTask, callback: Optional[Callable] = None) -> tuple[bool, Optional[StoreTask]]:
+        """Scrapes the task's store; whether it succeeded, and the task to retry if it failed."""
+        company_info = task.company_info
+
+        try:
+            self.scrape_store(company_info, callback)
+            return True, None
+        except (TimeoutException, FetchException) as e:
+            retry = self.throttle.retry(task) if self.throttle else None
+
+            if retry:
+                print(
+                    f"[{self.city}] {type(e).__name__} on {company_info.name}, retrying in {retry.delay():.1f}s")
+
+                if self.metrics:
+                    self.metrics.record_retry(self.city_query)
+            else:
+                print(
+                    f"[{self.city}] {type(e).__name__} on {company_info.name}")
+
+            if self.metrics and isinstance(e, TimeoutException):
+                self.metrics.record_timeout(self.city_query)
+            elif self.metrics:
+                self.metrics.record_error(self.city_query)
+
+            return False, retry
+        except Exception as e:
+            if self.driver_lost():
+                raise DriverLostException(
+                    f"[{self.city}] Driver lost on {company_info.name}") from e
+
+            print(traceback.format_exc())
+
+            if self.metrics:
+                self.metrics.record_error(self.city_query)
+
+        return False, None
+
+    def driver_lost(self) -> bool:
+        return self.driver is not None and not is_driver_alive(self.driver)
+
+    def scrape_stores(self, stores: Queue, callback: Optional[Callable] = None):
+        while True:
             try:
-                visited_stores[company_info.name] = True
+                task: StoreTask = stores.get_nowait()
+            except Empty:
+                return
 
-                # go to company page
-                e.click()
-                time.sleep(0.1)
-                self.wait_for_element(By.CLASS_NAME, "company__name")
+            time.sleep(task.delay())
 
-                company_url = driver.current_url
-                company_info.company_url = company_url
+            try:
+                _, retry = self.scrape_store_task(task, callback)
+            except DriverLostException:
+                # the drivers that are still alive finish the queue
+                stores.put(task)
+                raise
+
+            if retry:
+                stores.put(retry)
+
+    def helper_scraper(self, driver: Optional[WebDriver]) -> "DMScraper":
+        helper = type(self)(self.driver_pool, self.wait_stats,
+                            self.crawl_cache, self.journal, self.metrics, self.throttle,
+                            self.city_cache)
+        helper.driver = driver
+        helper.city = self.city
+        helper.city_query = self.city_query
+        helper.wait_timeout = self.wait_timeout
+        helper.wait_poll_interval = self.wait_poll_interval
+        helper.extraction_mode = self.extraction_mode
+        helper.recorder = self.recorder
+        helper.fetcher_name = self.fetcher_name
+        helper.http = self.http
+        return helper
+
+    def task_scraper(self, task: StoreTask) -> "DMScraper":
+        """Scraper sharing this one's driver, set to the task's city."""
+        scraper = self.helper_scraper(self.driver)
+        scraper.city = task.city
+        scraper.city_query = task.city_query
+        return scraper
+
+    def configure(self, opts: dict):
+        self.extraction_mode = opts.get(
+            "extraction_mode", EXTRACTION_MODE_SNAPSHOT)
+        self.wait_timeout = opts.get("wait_timeout", DEFAULT_TIMEOUT)
+        self.wait_poll_interval = opts.get(
+            "wait_poll_interval", DEFAULT_POLL_INTERVAL)
+
+        self.base_url = opts.get("base_url", BASE_URL)
+
+        self.fetcher_name = opts.get("fetcher", FETCHER_BROWSER)
+        if self.fetcher_name == FETCHER_HTTP and self.http is None:
+            self.http = http_pool_from_opts(opts)
+
+        if opts.get("record_dir"):
+            self.recorder = PageRecorder(opts["record_dir"])
+
+    def list_city(self, city_query: str, opts: dict) -> list[Company]:
+        """Finds the city and collects the stores left to scrape from its listing."""
+        self.city_query = city_query
+
+        city_url = opts.get("city_urls", {}).get(city_query)
+        cached = None
+
+        if not city_url and self.city_cache:
+            cached = self.city_cache.get(city_query)
+
+        if city_url:
+            self.driver.get(city_url)
+        elif cached:
+            self.driver.get(cached.url)
+        else:
+            self.search_city(city_query)
+
+        # phase one: collect every store link from the expanded listing
+        try:
+            stores = self.collect_stores(
+                opts.get("include_closed_stores", False))
+        except TimeoutException:
+            if cached:
+                # the landing page moved or went away, resolve the city again
+                print(f"[{city_query}] Cached city page failed, searching again")
+                self.city_cache.invalidate(city_query)
+                return self.list_city(city_query, opts)
 
-                if (callback):
-                    callback(company_data=company_info)
+            print(f"[{city_query}] No stores found")
+            return []
 
-                # emit company dataframe update
+        if self.city_cache and not city_url and not cached:
+            self.city_cache.put(city_query, self.city, self.driver.current_url)
 
-                self.wait_for_element(By.CLASS_NAME, "product-card", timeout=5)
+        if self.recorder:
+            self.recorder.record_city(city_query, self.driver)
 
-                categories_elements = driver.find_elements(
-                    By.CLASS_NAME,
-                    "product-categories__group"
-                )
+        if self.metrics:
+            self.metrics.city_listed(city_query, len(stores))
 
-                company_products = []
+        return stores
 
-                for c in categories_elements:
-                    category = c.find_element(
-                        By.CLASS_NAME,
-                        "category__title"
-                    ).text
+    def crawl_city(self, city_query: str, *, opts: Optional[dict], callback: Optional[Callable] = None):
+        self.configure(opts)
+        stores = self.list_city(city_query, opts)
+        self.scrape_store_list(stores, opts=opts, callback=callback)
 
-                    products_elements = c.find_elements(
-                        By.CLASS_NAME,
-                        "product-card"
-                    )
+    def run_city_task(self, scheduler: StoreScheduler, task: CityTask, opts: dict):
+        stores = []
 
-                    for product_wrapper in products_elements:
-                        try:
-                            product = self.scrape_product_info(
-                                product_wrapper,
-                                company_info,
-                                category
-                            )
+        try:
+            stores = self.list_city(task.city_query, opts)
+        except CityNotFoundException:
+            print(f"[{task.city_query}] City not found")
+        except Exception as e:
+            if self.driver_lost():
+                raise DriverLostException(
+                    f"[{task.city_query}] Driver lost while listing") from e
 
-                            company_products.append(product)
-                        except IgnoreProductException:
-                            continue
+            print(traceback.format_exc())
+            scheduler.task_failed(task)
+            return
 
-                products.extend(company_products)
+        scheduler.add_stores(task.city_query, [
+            StoreTask(company_info, city=self.city,
+                      city_query=task.city_query)
+            for company_info in stores
+        ])
+        scheduler.task_done(task)
 
-                if callback:
-                    callback(product_data=company_products)
-            except ElementClickInterceptedException:
-                continue
-            except TimeoutException:
-                print(f"[{city}] Timeout exception on {company_info.name}")
-                continue
+    def run_task(self, scheduler: StoreScheduler, task: CityTask | StoreTask, opts: dict, callback: Optional[Callable] = None):
+        if isinstance(task, CityTask):
+            self.run_city_task(scheduler, task, opts)
+            return
+
+        ok, retry = self.task_scraper(task).scrape_store_task(task, callback)
+
+        if retry:
+            scheduler.requeue(task, retry)
+        elif ok:
+            scheduler.task_done(task)
+        else:
+            scheduler.task_failed(task)
+
+    def requeue_lost_task(self, scheduler: StoreScheduler, task: CityTask | StoreTask):
+        """Puts back a task whose driver died under it, or fails it once it is out of attempts."""
+        max_attempts = self.throttle.max_attempts if self.throttle else DEFAULT_MAX_ATTEMPTS
+        retry = replace(task, attempt=task.attempt + 1)
+
+        if self.metrics:
+            self.metrics.record_error(task.city_query)
+
+        if retry.attempt >= max_attempts:
+            print(f"[{task.city_query}] Giving up on a task after {retry.attempt} lost drivers")
+            scheduler.task_failed(task)
+            return
+
+        if self.metrics:
+            self.metrics.record_retry(task.city_query)
+        scheduler.requeue(task, retry)
+
+    def work(self, scheduler: StoreScheduler, *, opts: dict, callback: Optional[Callable] = None):
+        """Runs listing and store tasks from the shared scheduler until the crawl is done.
+
+        The driver goes back to the pool, which clears its cookies and storage
+        and counts the use, whenever the next task belongs to another city. A
+        driver that dies, or fails to start, is discarded and its task is
+        requeued.
+        """
+        self.configure(opts)
+
+        task = scheduler.get()
+
+        while task is not None:
+            try:
+                driver = self.driver_pool.acquire()
             except Exception:
                 print(traceback.format_exc())
+                self.requeue_lost_task(scheduler, task)
+                task = scheduler.get()
                 continue
+
+            self.driver = driver
+            city_query = task.city_query
+            lost = False
+
+            try:
+                while task is not None and task.city_query == city_query:
+                    self.run_task(scheduler, task, opts, callback)
+                    task = scheduler.get()
+            except DriverLostException as e:
+                print(f"{e}, starting a new driver")
+                lost = True
+                self.requeue_lost_task(scheduler, task)
             finally:
-                driver.back()
+                self.driver = None
+                self.driver_pool.release(driver, discard=lost)
+
+            if lost:
+                task = scheduler.get()
+
+    def scrape_store_list(self, stores: list[Company], *, opts: dict, callback: Optional[Callable] = None):
+        store_workers = opts.get("store_workers", 1)
+
+        store_queue = Queue()
+        for company_info in stores:
+            store_queue.put(StoreTask(company_info))
+
+        # phase two: visit the stores directly. Browser fetches borrow idle
+        # drivers from the pool when there are any, HTTP fetches need none
+        helper_drivers = []
+        if self.fetcher_name == FETCHER_HTTP:
+            helper_drivers = [None] * (min(store_workers, len(stores)) - 1)
+        elif self.driver_pool is not None:
+            for _ in range(min(store_workers, len(stores)) - 1):
+                driver = self.driver_pool.try_acquire()
+                if driver is None:
+                    break
+                helper_drivers.append(driver)
+
+        try:
+            with ThreadPoolExecutor(max_workers=len(helper_drivers) + 1) as executor:
+                for driver in helper_drivers:
+                    executor.submit(
+                        self.helper_scraper(driver).scrape_stores,
+                        store_queue,
+                        callback
+                    )
 
-        return products
+                self.scrape_stores(store_queue, callback)
+        finally:
+            for driver in helper_drivers:
+                if driver is not None:
+                    self.driver_pool.release(driver)
@@ -0,0 +1,229 @@
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
+from queue import LifoQueue, Empty
+from threading import BoundedSemaphore, Lock
+from typing import Optional
+
+from selenium import webdriver
+from selenium.webdriver.chrome.webdriver import WebDriver
+from selenium.webdriver.chrome.options import Options
+
+from utils import get_webdriver_service
+
+
+class DriverPoolClosedException(Exception):
+    pass
+
+
+class DriverPoolTimeoutException(Exception):
+    pass
+
+
+DEFAULT_BLOCKED_URLS = [
+    "*.woff",
+    "*.woff2",
+    "*.ttf",
+    "*.otf",
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*doubleclick.net*",
+    "*facebook.net*",
+    "*facebook.com/tr*",
+    "*hotjar.com*",
+    "*clarity.ms*",
+]
+
+DEFAULT_WINDOW_SIZE = (1024, 768)
+
+
+@dataclass
+class BrowserProfile:
+    block_images: bool = True
+    blocked_urls: list[str] = field(
+        default_factory=lambda: list(DEFAULT_BLOCKED_URLS))
+    page_load_strategy: str = "eager"
+    window_size: Optional[tuple[int, int]] = DEFAULT_WINDOW_SIZE
+
+
+# plain headless Chrome, loading every resource
+FULL_PROFILE = BrowserProfile(
+    block_images=False,
+    blocked_urls=[],
+    page_load_strategy="normal",
+    window_size=None
+)
+
+
+def browser_profile_from_opts(opts: dict) -> BrowserProfile:
+    if not opts.get("block_resources", True):
+        return replace(FULL_PROFILE, window_size=opts.get("window_size", FULL_PROFILE.window_size))
+
+    return BrowserProfile(
+        block_images=opts.get("block_images", True),
+        blocked_urls=opts.get("blocked_urls", list(DEFAULT_BLOCKED_URLS)),
+        page_load_strategy=opts.get("page_load_strategy", "eager"),
+        window_size=opts.get("window_size", DEFAULT_WINDOW_SIZE),
+    )
+
+
+def create_driver(profile: BrowserProfile = FULL_PROFILE) -> WebDriver:
+    options = Options()
+    options.add_argument('--disable-gpu')
+    options.add_argument("--headless")
+    options.page_load_strategy = profile.page_load_strategy
+
+    if profile.window_size:
+        options.add_argument(
+            f"--window-size={profile.window_size[0]},{profile.window_size[1]}")
+
+    if profile.block_images:
+        # image URLs are still readable from the DOM, only the bytes are skipped
+        options.add_experimental_option(
+            "prefs", {"profile.managed_default_content_settings.images": 2})
+        options.add_argument("--blink-settings=imagesEnabled=false")
+
+    driver = webdriver.Chrome(options=options, service=get_webdriver_service())
+
+    if profile.blocked_urls:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd(
+            "Network.setBlockedURLs", {"urls": profile.blocked_urls})
+
+    return driver
+
+
+def is_driver_alive(driver: WebDriver) -> bool:
+    try:
+        driver.current_url
+        return True
+    except Exception:
+        return False
+
+
+class DriverPool:
+    """Bounded, thread-safe pool of Chrome drivers.
+
+    At most `max_size` drivers are checked out at once. Drivers are reset
+    (cookies and storage cleared) when returned and recycled after
+    `max_uses` checkouts.
+    """
+
+    def __init__(self, max_size: int = 4, max_uses: int = 10, checkout_timeout: Optional[float] = None, profile: BrowserProfile = FULL_PROFILE):
+        self.max_size = max_size
+        self.max_uses = max_uses
+        self.checkout_timeout = checkout_timeout
+        self.profile = profile
+
+        self._slots = BoundedSemaphore(max_size)
+        self._idle: LifoQueue[WebDriver] = LifoQueue()
+        self._uses: dict[int, int] = {}
+        self._lock = Lock()
+        self._closed = False
+
+    def _quit(self, driver: WebDriver):
+        with self._lock:
+            self._uses.pop(id(driver), None)
+
+        try:
+            driver.quit()
+        except Exception as e:
+            print(e)
+
+    def _reset(self, driver: WebDriver):
+        driver.delete_all_cookies()
+        driver.execute_script(
+            "window.localStorage.clear(); window.sessionStorage.clear();")
+        driver.get("about:blank")
+
+    def _take_idle_driver(self) -> Optional[WebDriver]:
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except Empty:
+                return None
+
+            if is_driver_alive(driver):
+                return driver
+
+            self._quit(driver)
+
+    def acquire(self, timeout: Optional[float] = None) -> WebDriver:
+        if self._closed:
+            raise DriverPoolClosedException("Driver pool is closed")
+
+        timeout = self.checkout_timeout if timeout is None else timeout
+
+        if not self._slots.acquire(timeout=timeout):
+            raise DriverPoolTimeoutException(
+                f"No driver available after {timeout}s")
+
+        try:
+            driver = self._take_idle_driver()
+
+            if driver is None:
+                print("Initializing driver")
+                driver = create_driver(self.profile)
+
+            with self._lock:
+                self._uses[id(driver)] = self._uses.get(id(driver), 0) + 1
+
+            return driver
+        except Exception:
+            self._slots.release()
+            raise
+
+    def try_acquire(self) -> Optional[WebDriver]:
+        """Checks out a driver only if one is available right away."""
+        try:
+            return self.acquire(timeout=0)
+        except DriverPoolTimeoutException:
+            return None
+
+    def release(self, driver: WebDriver, discard: bool = False):
+        with self._lock:
+            uses = self._uses.get(id(driver))
+
+        if uses is None:
+            return
+
+        try:
+            if discard or self._closed or uses >= self.max_uses:
+                self._quit(driver)
+                return
+
+            try:
+                self._reset(driver)
+            except Exception:
+                self._quit(driver)
+                return
+
+            self._idle.put(driver)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def driver(self):
+        driver = self.acquire()
+        discard = False
+        try:
+            yield driver
+        except Exception:
+            discard = not is_driver_alive(driver)
+            raise
+        finally:
+            self.release(driver, discard=discard)
+
+    def close(self):
+        self._closed = True
+
+        while True:
+            driver = self._take_idle_driver()
+            if driver is None:
+                break
+            self._quit(driver)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,14 @@
+class CityNotFoundException(Exception):
+    pass
+
+
+class IgnoreProductException(Exception):
+    pass
+
+
+class FetchException(Exception):
+    pass
+
+
+class DriverLostException(Exception):
+    pass
@@ -0,0 +1,202 @@
+"""Ways of loading a store page and reading its products.
+
+`BrowserFetcher` renders the store in the scraper's Chrome. `HttpFetcher`
+downloads the server-rendered HTML over a pooled keep-alive connection and
+reads the same fields with an HTML parser, so only the city search and the
+store listing need a browser. Both produce the snapshot shape of
+`STORE_SNAPSHOT_SCRIPT`, so the rows are identical.
+"""
+from html.parser import HTMLParser
+from typing import Any, Optional
+from urllib.parse import urljoin
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+
+from models.Company import Company
+from models.Product import ProductBatch
+
+from scraper.exceptions import FetchException
+from scraper.snapshot import parse_store_snapshot
+
+import urllib3
+
+FETCHER_BROWSER = "browser"
+FETCHER_HTTP = "http"
+
+DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/134.0.0.0 Safari/537.36"
+)
+
+# elements whose text is kept, keyed by the snapshot field they fill
+CARD_FIELDS = {
+    "product-card__title": "name",
+    "product-card__original-price": "original_price",
+    "product-card__price": "price",
+    "product-card__sale-price": "sale_price",
+}
+
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img",
+             "input", "link", "meta", "source", "track", "wbr"}
+
+
+class StoreHTMLParser(HTMLParser):
+    """Reads the product groups of a store page into the snapshot shape."""
+
+    def __init__(self, base_url: str):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.groups: list[dict] = []
+
+        # open elements, each with the snapshot roles it plays
+        self._stack: list[set[str]] = []
+        self._group: Optional[dict] = None
+        self._card: Optional[dict] = None
+        self._text_field: Optional[str] = None
+        self._text: list[str] = []
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, Any]]):
+        classes = set((dict(attrs).get("class") or "").split())
+        roles = set()
+
+        if "product-categories__group" in classes:
+            self._group = {"category": None, "products": []}
+            self.groups.append(self._group)
+            roles.add("group")
+        elif self._group is not None and "category__title" in classes and self._group["category"] is None and self._text_field is None:
+            self._start_text("category")
+            roles.add("text")
+        elif self._group is not None and "product-card" in classes:
+            self._card = {"name": None, "original_price": None,
+                          "price": None, "sale_price": None, "image_url": None}
+            self._group["products"].append(self._card)
+            roles.add("card")
+        elif self._card is not None and self._text_field is None:
+            field = next((CARD_FIELDS[c] for c in classes if c in CARD_FIELDS), None)
+            if field is not None and self._card[field] is None:
+                self._start_text(field)
+                roles.add("text")
+
+        if tag == "img" and self._card is not None and self._card["image_url"] is None:
+            src = dict(attrs).get("src")
+            self._card["image_url"] = urljoin(self.base_url, src) if src else None
+
+        if tag not in VOID_TAGS:
+            self._stack.append(roles)
+
+    def handle_endtag(self, tag: str):
+        if tag in VOID_TAGS or not self._stack:
+            return
+
+        roles = self._stack.pop()
+
+        if "text" in roles:
+            self._end_text()
+        if "card" in roles:
+            self._card = None
+        if "group" in roles:
+            self._group = None
+
+    def handle_data(self, data: str):
+        if self._text_field is not None:
+            self._text.append(data)
+
+    def _start_text(self, field: str):
+        self._text_field = field
+        self._text = []
+
+    def _end_text(self):
+        # innerText collapses whitespace the same way
+        text = " ".join("".join(self._text).split()) or None
+
+        if self._text_field == "category":
+            self._group["category"] = text
+        else:
+            self._card[self._text_field] = text
+
+        self._text_field = None
+
+
+def parse_store_html(html: str, base_url: str) -> list[dict]:
+    parser = StoreHTMLParser(base_url)
+    parser.feed(html)
+    parser.close()
+    return parser.groups
+
+
+def http_pool_from_opts(opts: dict) -> urllib3.PoolManager:
+    return urllib3.PoolManager(
+        maxsize=opts.get("store_workers", 1),
+        block=False,
+        headers={"User-Agent": opts.get("user_agent", DEFAULT_USER_AGENT)},
+        retries=urllib3.Retry(3, backoff_factor=0.5,
+                              status_forcelist=[429, 502, 503, 504]),
+        timeout=urllib3.Timeout(connect=5, read=opts.get("wait_timeout", 20)),
+    )
+
+
+class BrowserFetcher:
+    """Renders the store in the scraper's Chrome."""
+
+    def __init__(self, scraper):
+        self.scraper = scraper
+
+    def load(self, company_info: Company) -> None:
+        self.scraper.driver.get(company_info.company_url)
+        self.scraper.wait.element(
+            By.CLASS_NAME, "company__name", label="store page")
+
+    def products(self, company_info: Company, page: None) -> ProductBatch:
+        try:
+            self.scraper.wait.element(By.CLASS_NAME, "product-card",
+                                      5, label="product cards")
+        except TimeoutException:
+            # the store page has loaded, it just lists no products
+            print(f"[{self.scraper.city}] No products on {company_info.name}")
+
+        if self.scraper.recorder:
+            self.scraper.recorder.record_page(self.scraper.driver)
+
+        return self.scraper.scrape_store_products(company_info)
+
+
+class HttpFetcher:
+    """Downloads the store HTML without a browser."""
+
+    def __init__(self, scraper, http: urllib3.PoolManager):
+        self.scraper = scraper
+        self.http = http
+
+    def load(self, company_info: Company) -> str:
+        try:
+            response = self.http.request("GET", company_info.company_url)
+        except urllib3.exceptions.HTTPError as e:
+            raise FetchException(f"{company_info.company_url}: {e}") from e
+
+        if response.status >= 400:
+            raise FetchException(
+                f"{company_info.company_url} returned HTTP {response.status}")
+
+        return response.data.decode("utf-8", errors="replace")
+
+    def products(self, company_info: Company, page: str) -> ProductBatch:
+        if self.scraper.recorder:
+            self.scraper.recorder.record_html(company_info.company_url, page)
+
+        groups = parse_store_html(page, company_info.company_url)
+
+        if groups:
+            return parse_store_snapshot(groups, company_info, self.scraper.city)
+
+        # a client-rendered shell or an error page, not necessarily an empty
+        # store; let the browser render it, or fail so the store is retried
+        # instead of cached with no products
+        if self.scraper.driver is None:
+            raise FetchException(
+                f"{company_info.company_url} has no product groups")
+
+        print(f"[{self.scraper.city_query}] No product groups in the HTML of {company_info.company_url}, rendering it")
+
+        browser = BrowserFetcher(self.scraper)
+        return browser.products(company_info, browser.load(company_info))
@@ -1,17 +1,35 @@
-from concurrent.futures import ThreadPoolExecutor
-from scraper.dm_scraper import DMScraper, CityNotFoundException
+from concurrent.futures import ThreadPoolExecutor, wait
+from scraper.async_scraper import scraper_class_from_opts, store_concurrency_from_opts
+from scraper.checkpoint import CrawlJournal
+from scraper.city_cache import city_cache_from_opts
+from scraper.crawl_cache import crawl_cache_from_opts, DEFAULT_TTL
+from scraper.driver_pool import DriverPool, browser_profile_from_opts
+from scraper.scheduler import StoreScheduler
+from scraper.telemetry import CrawlMetrics
+from scraper.throttle import crawl_throttle_from_opts
 from threading import Lock
 from streamlit.runtime.scriptrunner import add_script_run_ctx
 
+import time
+import traceback
 
-def get_city_data(city, opts, callback):
-    try:
-        return DMScraper().scrape_city(city, opts=opts, callback=callback)
-    except CityNotFoundException:
-        return []
+MAX_WORKERS = 4
+REFRESH_INTERVAL = 2
+
+
+def crawl_worker(scheduler: StoreScheduler, opts, callback, **scraper_kwargs):
+    scraper_class_from_opts(opts)(**scraper_kwargs).work(
+        scheduler, opts=opts, callback=callback)
 
 
-def retrieve_data(cities: list[str], opts, update_product_callback, update_company_callback):
+def retrieve_data(cities: list[str], opts, update_product_callback, update_company_callback, metrics: CrawlMetrics = None, refresh_callback=None, refresh_interval: float = REFRESH_INTERVAL):
+    """Crawls the cities and feeds the rows to the update callbacks.
+
+    The update callbacks run on the scraper threads and should only store
+    the rows. `refresh_callback` runs on the calling thread at most every
+    `refresh_interval` seconds while the crawl is going, so rendering never
+    holds up the scrapers.
+    """
     product_lock = Lock()
     company_lock = Lock()
 
@@ -24,13 +42,85 @@ def retrieve_data(cities: list[str], opts, update_product_callback, update_compa
             with company_lock:
                 update_company_callback([company_data])
 
-    with ThreadPoolExecutor(max_workers=4) as executor:
-        {executor.submit(
-            get_city_data,
-            city,
-            opts,
-            callback
-        ): city for city in cities}
+    metrics = metrics or CrawlMetrics()
+    crawl_cache = crawl_cache_from_opts(opts)
+    throttle = crawl_throttle_from_opts(
+        opts, max_requests=MAX_WORKERS * store_concurrency_from_opts(opts))
+    city_cache = city_cache_from_opts(opts)
+    journal = CrawlJournal(cities, max_age=opts.get(
+        "cache_ttl", DEFAULT_TTL)) if opts.get("resume", True) else None
+
+    if journal and journal.is_resuming():
+        print(
+            f"Resuming crawl: {len(journal.done_cities)} cities and {len(journal.store_urls)} stores done")
+
+        for company, products in journal.replay():
+            callback(company_data=company)
+            callback(product_data=products)
+
+    def city_done(city: str):
+        if journal:
+            journal.record_city(city)
+        metrics.city_finished(city)
+
+    # cities are split into store tasks that every worker pulls from, so a
+    # large city doesn't keep a single worker busy
+    scheduler = StoreScheduler(
+        [city for city in cities if not (journal and journal.is_city_done(city))],
+        on_city_done=city_done
+    )
+
+    driver_pool = DriverPool(
+        max_size=MAX_WORKERS,
+        max_uses=opts.get("driver_max_uses", 10),
+        profile=browser_profile_from_opts(opts)
+    )
+
+    try:
+        with driver_pool, ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            pending = {executor.submit(
+                crawl_worker,
+                scheduler,
+                opts,
+                callback,
+                driver_pool=driver_pool,
+                wait_stats=metrics.waits,
+                crawl_cache=crawl_cache,
+                journal=journal,
+                metrics=metrics,
+                throttle=throttle,
+                city_cache=city_cache
+            ) for _ in range(MAX_WORKERS)}
+
+            for t in executor._threads:
+                add_script_run_ctx(t)
+
+            last_refresh = time.monotonic()
+            while pending:
+                done, pending = wait(pending, timeout=refresh_interval)
+
+                for future in done:
+                    if future.exception():
+                        traceback.print_exception(future.exception())
+
+                if refresh_callback and time.monotonic() - last_refresh >= refresh_interval:
+                    refresh_callback()
+                    last_refresh = time.monotonic()
+    finally:
+        if journal:
+            journal.close()
+
+    metrics.flush()
+
+    for label, summary in metrics.waits.summary().items():
+        print(f"Wait '{label}': {summary}")
+
+    if crawl_cache:
+        print(f"Crawl cache: {crawl_cache.stats()}")
+        crawl_cache.close()
+
+    if city_cache:
+        print(f"City cache: {city_cache.stats()}")
+        city_cache.close()
 
-        for t in executor._threads:
-            add_script_run_ctx(t)
+    return metrics
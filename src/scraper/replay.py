@@ -0,0 +1,135 @@
+"""Records the pages a crawl visits and replays them from a local HTTP server.
+
+Record while crawling by passing `record_dir` in the scraper options. The
+recording can then be served offline:
+
+    with ReplayServer("recordings/florianopolis") as server:
+        DMScraper().scrape_city("FLORIANOPOLIS", opts=server.opts())
+"""
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from threading import Lock, Thread
+from urllib.parse import urlsplit
+
+from selenium.webdriver.chrome.webdriver import WebDriver
+
+import hashlib
+import json
+import os
+import re
+
+SITE_ORIGIN = "https://www.deliverymuch.com.br"
+
+# the recorded DOM is already rendered, so the app scripts must not run again
+SCRIPT_TAG = re.compile(r"<script\b[^>]*>.*?</script>", re.S | re.I)
+
+
+def page_key(url: str) -> str:
+    parts = urlsplit(url)
+    return parts.path + (f"?{parts.query}" if parts.query else "")
+
+
+class PageRecorder:
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.index_path = os.path.join(directory, "index.json")
+
+        os.makedirs(os.path.join(directory, "pages"), exist_ok=True)
+
+        self._lock = Lock()
+        self._index = {"pages": {}, "cities": {}}
+
+        if os.path.exists(self.index_path):
+            with open(self.index_path, encoding="utf-8") as f:
+                self._index = json.load(f)
+
+    def _save_index(self):
+        with open(self.index_path, "w", encoding="utf-8") as f:
+            json.dump(self._index, f, ensure_ascii=False, indent=2)
+
+    def record_page(self, driver: WebDriver):
+        self.record_html(driver.current_url, driver.page_source)
+
+    def record_html(self, url: str, html: str):
+        key = page_key(url)
+        html = SCRIPT_TAG.sub("", html).replace(SITE_ORIGIN, "")
+        name = hashlib.sha1(key.encode()).hexdigest() + ".html"
+
+        with open(os.path.join(self.directory, "pages", name), "w", encoding="utf-8") as f:
+            f.write(html)
+
+        with self._lock:
+            self._index["pages"][key] = name
+            self._save_index()
+
+    def record_city(self, city_query: str, driver: WebDriver):
+        with self._lock:
+            self._index["cities"][city_query] = page_key(driver.current_url)
+            self._save_index()
+
+
+class ReplayServer:
+    """Serves a recording made by `PageRecorder` on localhost."""
+
+    def __init__(self, directory: str, port: int = 0):
+        with open(os.path.join(directory, "index.json"), encoding="utf-8") as f:
+            index = json.load(f)
+
+        pages = {
+            key: os.path.join(directory, "pages", name)
+            for key, name in index["pages"].items()
+        }
+        self.pages: dict[str, str] = pages
+        self.cities: dict[str, str] = index["cities"]
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = pages.get(self.path) or pages.get(
+                    self.path.rstrip("/"))
+
+                if path is None:
+                    self.send_error(404)
+                    return
+
+                with open(path, "rb") as f:
+                    body = f.read()
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self._thread = Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def opts(self, **opts) -> dict:
+        """Scraper options pointing at the replayed site."""
+        return {
+            "base_url": self.url + "/",
+            "city_urls": {city: self.url + path for city, path in self.cities.items()},
+            "use_cache": False,
+            "resume": False,
+            **opts,
+        }
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,309 @@
+"""Headless crawl runner that shards cities across worker processes.
+
+Run from the `src` directory:
+
+    python -m scraper.runner "FLORIANOPOLIS" "JOINVILLE" --workers 4 --output out
+
+To split a crawl across machines, enqueue the cities into a shared
+directory once and start a runner pointing at it on every machine:
+
+    python -m scraper.runner "FLORIANOPOLIS" "JOINVILLE" --work-dir /mnt/crawl --enqueue-only
+    python -m scraper.runner --work-dir /mnt/crawl --workers 2 --output out
+"""
+from dataclasses import asdict, dataclass, field
+from multiprocessing import Process, Queue
+from queue import Empty
+from typing import Optional
+
+import argparse
+import json
+import os
+import socket
+import time
+import traceback
+
+CLAIM_TIMEOUT = 30
+
+
+class LocalWorkQueue:
+    """Work queue shared by the worker processes of a single runner.
+
+    The cities are followed by one `None` per worker, so a worker only stops
+    once it reaches the end of the queue, not when the queue merely looks
+    empty before the parent's feeder thread has flushed it.
+    """
+
+    def __init__(self, cities: list[str], workers: int):
+        self.queue = Queue()
+        for city in cities:
+            self.queue.put(city)
+        for _ in range(workers):
+            self.queue.put(None)
+
+    def claim(self, worker_id: str) -> Optional[str]:
+        try:
+            return self.queue.get(timeout=CLAIM_TIMEOUT)
+        except Empty:
+            return None
+
+    def complete(self, city: str):
+        pass
+
+
+class FileWorkQueue:
+    """Work queue stored in a directory, so several machines can share it.
+
+    Each pending city is a file in `pending/`. Workers claim a city by
+    atomically renaming its file into `claimed/`, and move it to `done/`
+    once the city is finished.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._claimed: dict[str, str] = {}
+        for name in ("pending", "claimed", "done"):
+            os.makedirs(os.path.join(directory, name), exist_ok=True)
+
+    def _path(self, state: str, name: str) -> str:
+        return os.path.join(self.directory, state, name)
+
+    def enqueue(self, cities: list[str]):
+        for index, city in enumerate(cities):
+            name = f"{index:05d}-{city.replace(os.sep, '_')}.task"
+            with open(self._path("pending", name), "w", encoding="utf-8") as f:
+                f.write(city)
+
+    def claim(self, worker_id: str) -> Optional[str]:
+        for name in sorted(os.listdir(os.path.join(self.directory, "pending"))):
+            claimed = f"{worker_id}@{name}"
+            try:
+                os.rename(self._path("pending", name),
+                          self._path("claimed", claimed))
+            except OSError:
+                # another worker got it first
+                continue
+
+            with open(self._path("claimed", claimed), encoding="utf-8") as f:
+                city = f.read()
+
+            self._claimed[city] = claimed
+            return city
+
+        return None
+
+    def complete(self, city: str):
+        claimed = self._claimed.pop(city, None)
+        if claimed:
+            os.replace(self._path("claimed", claimed),
+                       self._path("done", claimed.split("@", 1)[1]))
+
+
+@dataclass
+class ShardStats:
+    worker_id: str
+    cities: list[str] = field(default_factory=list)
+    stores: int = 0
+    products: int = 0
+    seconds: float = 0
+
+    def products_per_second(self) -> float:
+        return self.products / self.seconds if self.seconds else 0
+
+
+def crawl_worker(worker_id: str, work_queue, results: Queue, opts: dict, drivers_per_worker: int):
+    from scraper.async_scraper import scraper_class_from_opts, store_concurrency_from_opts
+    from scraper.city_cache import city_cache_from_opts
+    from scraper.crawl_cache import crawl_cache_from_opts
+    from scraper.driver_pool import DriverPool, browser_profile_from_opts
+    from scraper.exceptions import CityNotFoundException
+    from scraper.throttle import crawl_throttle_from_opts
+
+    def callback(*, product_data=None, company_data=None):
+        if company_data:
+            results.put(("company", worker_id, company_data))
+        if product_data:
+            results.put(("products", worker_id, product_data))
+
+    worker_opts = {**opts, "store_workers": drivers_per_worker}
+    crawl_cache = crawl_cache_from_opts(opts)
+    throttle = crawl_throttle_from_opts(
+        opts, max_requests=store_concurrency_from_opts(worker_opts))
+    city_cache = city_cache_from_opts(opts)
+
+    driver_pool = DriverPool(
+        max_size=drivers_per_worker,
+        max_uses=opts.get("driver_max_uses", 10),
+        profile=browser_profile_from_opts(opts)
+    )
+
+    with driver_pool:
+        while (city := work_queue.claim(worker_id)) is not None:
+            start = time.perf_counter()
+            try:
+                scraper_class_from_opts(opts)(driver_pool, crawl_cache=crawl_cache, throttle=throttle, city_cache=city_cache).scrape_city(
+                    city, opts=worker_opts, callback=callback)
+            except CityNotFoundException:
+                print(f"[{worker_id}] City {city} not found")
+            except Exception:
+                print(traceback.format_exc())
+
+            work_queue.complete(city)
+            results.put(("shard_done", worker_id, (city,
+                        time.perf_counter() - start)))
+
+    if crawl_cache:
+        print(f"[{worker_id}] Crawl cache: {crawl_cache.stats()}")
+        crawl_cache.close()
+
+    if city_cache:
+        city_cache.close()
+
+    results.put(("worker_done", worker_id, None))
+
+
+def run_crawl(cities: list[str], opts: dict, *, workers: int = 4, drivers_per_worker: int = 1, queue_size: int = 1000, output: str = "output", work_dir: Optional[str] = None) -> dict[str, ShardStats]:
+    """Crawls the cities in `workers` processes and streams the rows to NDJSON files.
+
+    `queue_size` bounds the result queue, so workers block when the writer
+    falls behind.
+    """
+    os.makedirs(output, exist_ok=True)
+
+    if work_dir:
+        work_queue = FileWorkQueue(work_dir)
+        if cities:
+            work_queue.enqueue(cities)
+    else:
+        work_queue = LocalWorkQueue(cities, workers)
+
+    results = Queue(maxsize=queue_size)
+    host = socket.gethostname()
+    stats: dict[str, ShardStats] = {}
+    processes = []
+
+    for index in range(workers):
+        worker_id = f"{host}-{os.getpid()}-{index}"
+        stats[worker_id] = ShardStats(worker_id)
+        process = Process(
+            target=crawl_worker,
+            args=(worker_id, work_queue, results, opts, drivers_per_worker),
+            daemon=True
+        )
+        process.start()
+        processes.append(process)
+
+    running = len(processes)
+
+    with open(os.path.join(output, "products.jsonl"), "a", encoding="utf-8") as products_file, \
+            open(os.path.join(output, "companies.jsonl"), "a", encoding="utf-8") as companies_file:
+        while running:
+            try:
+                kind, worker_id, payload = results.get(timeout=1)
+            except Empty:
+                if not any(p.is_alive() for p in processes):
+                    break
+                continue
+
+            shard = stats[worker_id]
+
+            match kind:
+                case "company":
+                    shard.stores += 1
+                    companies_file.write(json.dumps(
+                        asdict(payload), ensure_ascii=False) + "\n")
+                case "products":
+                    shard.products += len(payload)
+                    products_file.writelines(
+                        json.dumps(p, ensure_ascii=False) + "\n" for p in payload.to_dicts())
+                case "shard_done":
+                    city, seconds = payload
+                    shard.cities.append(city)
+                    shard.seconds += seconds
+                    print(
+                        f"[{worker_id}] {city} done in {seconds:.1f}s, {shard.products_per_second():.1f} products/s")
+                case "worker_done":
+                    running -= 1
+
+    for process in processes:
+        process.join()
+
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless DM Scraper crawl")
+    parser.add_argument("cities", nargs="*")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--drivers-per-worker", type=int, default=1)
+    parser.add_argument("--queue-size", type=int, default=1000)
+    parser.add_argument("--output", default="output")
+    parser.add_argument("--work-dir", default=None,
+                        help="shared directory used as work queue across machines")
+    parser.add_argument("--enqueue-only", action="store_true",
+                        help="only add the cities to --work-dir")
+    parser.add_argument("--include-closed-stores", action="store_true")
+    parser.add_argument("--no-block-resources", action="store_true",
+                        help="let Chrome load images, fonts and trackers")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="re-scrape every store instead of using the crawl cache")
+    parser.add_argument("--cache-ttl", type=float, default=None,
+                        help="seconds a cached store stays fresh")
+    parser.add_argument("--no-city-cache", action="store_true",
+                        help="always resolve cities through the search box")
+    parser.add_argument("--engine", choices=["selenium", "async"], default="selenium",
+                        help="async visits the stores of a city in concurrent browser tabs")
+    parser.add_argument("--max-tabs", type=int, default=8,
+                        help="tabs open at once per worker with --engine async")
+    parser.add_argument("--fetcher", choices=["browser", "http"], default="browser",
+                        help="http downloads store pages without rendering them in Chrome")
+    parser.add_argument("--no-throttle", action="store_true",
+                        help="disable adaptive concurrency, rate limiting and store retries")
+    parser.add_argument("--host-rate", type=float, default=None,
+                        help="requests per second allowed per host")
+    parser.add_argument("--max-concurrency", type=int, default=None,
+                        help="upper bound for concurrent store requests per worker")
+    args = parser.parse_args()
+
+    if args.enqueue_only:
+        if not args.work_dir:
+            parser.error("--enqueue-only requires --work-dir")
+        FileWorkQueue(args.work_dir).enqueue(args.cities)
+        return
+
+    opts = {
+        "include_closed_stores": args.include_closed_stores,
+        "use_cache": not args.no_cache,
+        "use_city_cache": not args.no_city_cache,
+        "block_resources": not args.no_block_resources,
+        "engine": args.engine,
+        "max_tabs": args.max_tabs,
+        "fetcher": args.fetcher,
+        "throttle": not args.no_throttle,
+    }
+
+    if args.host_rate is not None:
+        opts["host_rate"] = args.host_rate
+
+    if args.max_concurrency is not None:
+        opts["max_concurrency"] = args.max_concurrency
+
+    if args.cache_ttl is not None:
+        opts["cache_ttl"] = args.cache_ttl
+
+    stats = run_crawl(
+        args.cities,
+        opts,
+        workers=args.workers,
+        drivers_per_worker=args.drivers_per_worker,
+        queue_size=args.queue_size,
+        output=args.output,
+        work_dir=args.work_dir
+    )
+
+    for shard in stats.values():
+        print(
+            f"{shard.worker_id}: {len(shard.cities)} cities, {shard.stores} stores, {shard.products} products in {shard.seconds:.1f}s ({shard.products_per_second():.1f} products/s)")
+
+
+if __name__ == "__main__":
+    main()
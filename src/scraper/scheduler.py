@@ -0,0 +1,127 @@
+from dataclasses import dataclass
+from threading import Condition
+from typing import Callable, Optional
+
+from scraper.throttle import StoreTask
+
+import heapq
+import itertools
+import time
+
+# listings go first, so every city's stores are in the queue early and the
+# workers spread over all of them
+CITY_PRIORITY = 0
+STORE_PRIORITY = 1
+
+
+@dataclass
+class CityTask:
+    city_query: str
+    ready_at: float = 0
+    attempt: int = 0
+
+
+class StoreScheduler:
+    """Priority queue of crawl work shared by every worker of a crawl.
+
+    Each city starts as a `CityTask`. The worker that lists it adds one
+    `StoreTask` per store back into the queue, so a large city is spread
+    over all the workers instead of keeping one of them busy. Tasks are
+    served by ready time (retries wait out their backoff), listings first.
+
+    `on_city_done` is called once the listing and every store of a city
+    are finished. A city with a task given up through `task_failed` is
+    never reported done, so a resumed crawl visits it again.
+    """
+
+    def __init__(self, cities: list[str], on_city_done: Optional[Callable[[str], None]] = None):
+        self.on_city_done = on_city_done
+
+        self._condition = Condition()
+        self._heap: list[tuple] = []
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        self._remaining: dict[str, int] = {}
+        self._listed: set[str] = set()
+        self._failed: set[str] = set()
+
+        for city_query in cities:
+            self._remaining[city_query] = 0
+            self._push(CityTask(city_query), CITY_PRIORITY)
+
+    def _push(self, task: CityTask | StoreTask, priority: int):
+        heapq.heappush(
+            self._heap, (task.ready_at, priority, next(self._sequence), task))
+
+    @property
+    def done(self) -> bool:
+        with self._condition:
+            return not self._heap and self._in_flight == 0
+
+    def _pop_ready(self) -> Optional[CityTask | StoreTask]:
+        if self._heap and self._heap[0][0] <= time.monotonic():
+            self._in_flight += 1
+            return heapq.heappop(self._heap)[-1]
+        return None
+
+    def try_get(self) -> Optional[CityTask | StoreTask]:
+        """A ready task, or None when there is none right now (see `done`)."""
+        with self._condition:
+            return self._pop_ready()
+
+    def get(self) -> Optional[CityTask | StoreTask]:
+        """Blocks until a task is ready, or returns None once all work is done."""
+        with self._condition:
+            while True:
+                task = self._pop_ready()
+                if task is not None:
+                    return task
+
+                if not self._heap and self._in_flight == 0:
+                    return None
+
+                timeout = self._heap[0][0] - \
+                    time.monotonic() if self._heap else None
+                self._condition.wait(timeout)
+
+    def add_stores(self, city_query: str, tasks: list[StoreTask]):
+        with self._condition:
+            self._remaining[city_query] += len(tasks)
+            for task in tasks:
+                self._push(task, STORE_PRIORITY)
+            self._condition.notify_all()
+
+    def requeue(self, task: CityTask | StoreTask, retry: CityTask | StoreTask):
+        with self._condition:
+            self._in_flight -= 1
+            self._push(retry, CITY_PRIORITY if isinstance(
+                retry, CityTask) else STORE_PRIORITY)
+            self._condition.notify_all()
+
+    def task_done(self, task: CityTask | StoreTask):
+        self._finish(task, failed=False)
+
+    def task_failed(self, task: CityTask | StoreTask):
+        """Gives up on the task and keeps its city from being reported done."""
+        self._finish(task, failed=True)
+
+    def _finish(self, task: CityTask | StoreTask, failed: bool):
+        with self._condition:
+            self._in_flight -= 1
+
+            if isinstance(task, CityTask):
+                self._listed.add(task.city_query)
+            else:
+                self._remaining[task.city_query] -= 1
+
+            city_query = task.city_query
+            if failed:
+                self._failed.add(city_query)
+
+            city_done = city_query in self._listed and self._remaining[city_query] == 0 \
+                and city_query not in self._failed
+
+            self._condition.notify_all()
+
+        if city_done and self.on_city_done:
+            self.on_city_done(city_query)
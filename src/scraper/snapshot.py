@@ -0,0 +1,107 @@
+from typing import Optional
+
+from models.Product import ProductBatch
+from models.Company import Company
+
+from scraper.exceptions import IgnoreProductException
+from scraper.scraper_utils import format_price
+
+# Collects every product card of a store page in a single WebDriver call.
+STORE_SNAPSHOT_SCRIPT = """
+const text = (root, cls) => {
+    const el = root.getElementsByClassName(cls)[0];
+    return el ? el.innerText.trim() : null;
+};
+
+return Array.from(document.getElementsByClassName('product-categories__group')).map(group => ({
+    category: text(group, 'category__title'),
+    products: Array.from(group.getElementsByClassName('product-card')).map(card => {
+        const img = card.getElementsByTagName('img')[0];
+        return {
+            name: text(card, 'product-card__title'),
+            original_price: text(card, 'product-card__original-price'),
+            price: text(card, 'product-card__price'),
+            sale_price: text(card, 'product-card__sale-price'),
+            image_url: img ? img.src : null,
+        };
+    }),
+}));
+"""
+
+# Reads a `company-list__item` element passed as arguments[0].
+COMPANY_SNAPSHOT_SCRIPT = """
+const card = arguments[0];
+const text = (cls) => {
+    const el = card.getElementsByClassName(cls)[0];
+    return el ? el.innerText.trim() : null;
+};
+const logo = card.querySelector('.company__logo > img');
+// the card itself or its nearest link ancestor, else the first link inside it
+const link = card.closest('a[href]') || card.querySelector('a[href]');
+
+return {
+    name: text('company__name'),
+    score: text('company__score'),
+    badges: Array.from(card.getElementsByClassName('company__badges')).map(b => b.innerText.trim()),
+    is_closed: card.getElementsByTagName('figcaption').length > 0,
+    image_url: logo ? logo.src : null,
+    company_url: link ? link.href : null,
+};
+"""
+
+
+def parse_company_snapshot(data: dict, city: Optional[str]) -> Company:
+    score = data.get("score")
+
+    return Company(
+        name=data.get("name"),
+        rating=float(score) if score and score != "Novo" else None,
+        banners=list(data.get("badges") or []),
+        is_closed=bool(data.get("is_closed")),
+        city=city,
+        company_url=data.get("company_url"),
+        image_url=data.get("image_url")
+    )
+
+
+def product_snapshot_values(data: dict, company_info: Company, category: str, city: Optional[str]) -> dict:
+    if data.get("name") is None:
+        raise IgnoreProductException("Product name not found")
+
+    price = data.get("original_price")
+
+    if price is None:
+        price = data.get("price")
+
+        if price is None:
+            raise IgnoreProductException("Product price not found")
+
+    final_price = data.get("sale_price")
+
+    return dict(
+        name=data["name"],
+        original_price=format_price(price),
+        final_price=format_price(final_price) if final_price else None,
+        category=category.lower(),
+        company_name=company_info.name,
+        company_url=company_info.company_url,
+        city=city,
+        is_closed=company_info.is_closed,
+        image_url=data.get("image_url"),
+    )
+
+
+def parse_store_snapshot(snapshot: list[dict], company_info: Company, city: Optional[str]) -> ProductBatch:
+    products = ProductBatch()
+
+    for group in snapshot:
+        category = group.get("category") or ""
+
+        for data in group.get("products", []):
+            try:
+                products.add(**product_snapshot_values(
+                    data, company_info, category, city))
+            except IgnoreProductException:
+                continue
+
+    return products
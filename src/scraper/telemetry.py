@@ -0,0 +1,193 @@
+from dataclasses import dataclass
+from threading import Lock
+from typing import Optional
+
+from consts import DATA_DIR
+from scraper.waits import WaitStats
+
+import json
+import os
+import time
+
+DEFAULT_METRICS_DIR = os.path.join(DATA_DIR, "metrics")
+
+
+@dataclass
+class CityProgress:
+    listed: Optional[int] = None
+    stores: int = 0
+    cached_stores: int = 0
+    products: int = 0
+    timeouts: int = 0
+    errors: int = 0
+    retries: int = 0
+    finished: bool = False
+
+
+class CrawlMetrics:
+    """Thread-safe crawl counters, exposed as JSON and Prometheus text."""
+
+    def __init__(self, directory: str = DEFAULT_METRICS_DIR, flush_interval: float = 5):
+        self.directory = directory
+        self.flush_interval = flush_interval
+
+        self.started_at = time.time()
+        self.waits = WaitStats()
+        self.cities: dict[str, CityProgress] = {}
+        self.page_loads: list[float] = []
+        self.driver_memory_mb: dict[str, float] = {}
+
+        self._lock = Lock()
+        self._flush_lock = Lock()
+        self._flushed_at = 0.0
+
+    def _city(self, city: str) -> CityProgress:
+        return self.cities.setdefault(city, CityProgress())
+
+    def city_listed(self, city: str, stores: int):
+        with self._lock:
+            self._city(city).listed = stores
+
+    def city_finished(self, city: str):
+        with self._lock:
+            self._city(city).finished = True
+        self.flush()
+
+    def store_done(self, city: str, products: int, page_load: Optional[float] = None, cached: bool = False):
+        with self._lock:
+            progress = self._city(city)
+            progress.stores += 1
+            progress.products += products
+            if cached:
+                progress.cached_stores += 1
+            if page_load is not None:
+                self.page_loads.append(page_load)
+        self.flush(force=False)
+
+    def record_timeout(self, city: str):
+        with self._lock:
+            self._city(city).timeouts += 1
+
+    def record_error(self, city: str):
+        with self._lock:
+            self._city(city).errors += 1
+
+    def record_retry(self, city: str):
+        with self._lock:
+            self._city(city).retries += 1
+
+    def record_driver_memory(self, driver_id: str, mb: float):
+        with self._lock:
+            self.driver_memory_mb[driver_id] = mb
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            cities = {city: vars(progress).copy()
+                      for city, progress in self.cities.items()}
+            page_loads = sorted(self.page_loads)
+            driver_memory = dict(self.driver_memory_mb)
+
+        elapsed_minutes = max(time.time() - self.started_at, 1e-9) / 60
+        stores = sum(c["stores"] for c in cities.values())
+        products = sum(c["products"] for c in cities.values())
+
+        return {
+            "elapsed_seconds": elapsed_minutes * 60,
+            "stores": stores,
+            "products": products,
+            "stores_per_minute": stores / elapsed_minutes,
+            "products_per_minute": products / elapsed_minutes,
+            "timeouts": sum(c["timeouts"] for c in cities.values()),
+            "retries": sum(c["retries"] for c in cities.values()),
+            "errors": sum(c["errors"] for c in cities.values()),
+            "cities": cities,
+            "page_load": {
+                "count": len(page_loads),
+                "sum": sum(page_loads),
+                "p50": page_loads[len(page_loads) // 2] if page_loads else None,
+                "p95": page_loads[min(len(page_loads) - 1, int(len(page_loads) * 0.95))] if page_loads else None,
+                "max": page_loads[-1] if page_loads else None,
+            },
+            "waits": self.waits.summary(),
+            "driver_memory_mb": driver_memory,
+        }
+
+    def to_prometheus(self, snapshot: Optional[dict] = None) -> str:
+        snapshot = snapshot or self.snapshot()
+        lines = []
+
+        def escape(value) -> str:
+            return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+        def sample(name: str, labels: dict, value: float):
+            label_text = ",".join(f'{k}="{escape(v)}"' for k, v in labels.items())
+            lines.append(
+                f"dm_scraper_{name}{{{label_text}}} {value}" if label_text else f"dm_scraper_{name} {value}")
+
+        def metric(name: str, kind: str, help: str, samples: list[tuple[dict, float]]):
+            lines.append(f"# HELP dm_scraper_{name} {help}")
+            lines.append(f"# TYPE dm_scraper_{name} {kind}")
+            for labels, value in samples:
+                sample(name, labels, value)
+
+        def summary(name: str, help: str, summaries: list[tuple[dict, dict]]):
+            metric(name, "summary", help,
+                   [({**labels, "quantile": q}, s[k]) for labels, s in summaries if s["count"]
+                    for q, k in (("0.5", "p50"), ("0.95", "p95"))])
+            for labels, s in summaries:
+                sample(f"{name}_sum", labels, s["sum"])
+                sample(f"{name}_count", labels, s["count"])
+
+        cities = snapshot["cities"]
+
+        metric("stores_total", "counter", "Stores scraped.",
+               [({"city": c}, p["stores"]) for c, p in cities.items()])
+        metric("products_total", "counter", "Products scraped.",
+               [({"city": c}, p["products"]) for c, p in cities.items()])
+        metric("stores_listed", "gauge", "Stores found on the city listing.",
+               [({"city": c}, p["listed"]) for c, p in cities.items() if p["listed"] is not None])
+        metric("timeouts_total", "counter", "Store timeouts.",
+               [({"city": c}, p["timeouts"]) for c, p in cities.items()])
+        metric("retries_total", "counter", "City search and store page retries.",
+               [({"city": c}, p["retries"]) for c, p in cities.items()])
+        metric("errors_total", "counter", "Store pages and tasks that failed with an error.",
+               [({"city": c}, p["errors"]) for c, p in cities.items()])
+        metric("stores_per_minute", "gauge", "Store throughput.",
+               [({}, snapshot["stores_per_minute"])])
+        metric("products_per_minute", "gauge", "Product throughput.",
+               [({}, snapshot["products_per_minute"])])
+        summary("page_load_seconds", "Time to load a store page and read its products.",
+                [({}, snapshot["page_load"])])
+        summary("wait_seconds", "Time spent in DOM waits.",
+                [({"wait": w}, {**s, "sum": s["mean"] * s["count"]}) for w, s in snapshot["waits"].items()])
+        metric("driver_js_heap_mb", "gauge", "JS heap used by each driver.",
+               [({"driver": d}, mb) for d, mb in snapshot["driver_memory_mb"].items()])
+
+        return "\n".join(lines) + "\n"
+
+    def flush(self, force: bool = True):
+        """Writes metrics.json and metrics.prom, at most every `flush_interval` seconds unless forced."""
+        now = time.time()
+        if not force and now - self._flushed_at < self.flush_interval:
+            return
+
+        # another thread is already writing the files
+        if not self._flush_lock.acquire(blocking=force):
+            return
+
+        try:
+            self._flushed_at = now
+
+            snapshot = self.snapshot()
+            os.makedirs(self.directory, exist_ok=True)
+
+            for name, content in (
+                ("metrics.json", json.dumps(snapshot, ensure_ascii=False, indent=2)),
+                ("metrics.prom", self.to_prometheus(snapshot)),
+            ):
+                path = os.path.join(self.directory, name)
+                with open(path + ".tmp", "w", encoding="utf-8") as f:
+                    f.write(content)
+                os.replace(path + ".tmp", path)
+        finally:
+            self._flush_lock.release()
@@ -0,0 +1,202 @@
+"""Adaptive concurrency, per-host rate limiting and retry backoff for store fetches.
+
+`CrawlThrottle` gates every store request of a crawl: at most `limit`
+requests run at once, and the limit follows AIMD (additive increase,
+multiplicative decrease) on the latency and error rate of the last few
+requests. Each host also gets a token bucket, so bursts stay under
+`rate` requests per second. Stores that time out are requeued with
+exponential backoff instead of being dropped.
+"""
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, replace
+from threading import Condition, Lock
+from typing import Optional
+from urllib.parse import urlsplit
+
+from models.Company import Company
+
+import asyncio
+import random
+import time
+
+DEFAULT_INITIAL_CONCURRENCY = 4
+DEFAULT_MAX_CONCURRENCY = 16
+DEFAULT_TARGET_LATENCY = 8
+DEFAULT_ERROR_THRESHOLD = 0.2
+DEFAULT_HOST_RATE = 4
+DEFAULT_HOST_BURST = 8
+DEFAULT_MAX_ATTEMPTS = 4
+
+
+@dataclass
+class StoreTask:
+    company_info: Company
+    attempt: int = 0
+    ready_at: float = 0
+    city: Optional[str] = None
+    city_query: Optional[str] = None
+
+    def delay(self) -> float:
+        return max(0, self.ready_at - time.monotonic())
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = Lock()
+
+    def reserve(self) -> float:
+        """Takes a token and returns how long to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens +
+                               (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+
+            return 0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+class AIMDController:
+    """Concurrency limit that grows by one while requests are healthy and halves when they aren't."""
+
+    def __init__(self, initial: int = DEFAULT_INITIAL_CONCURRENCY, minimum: int = 1, maximum: int = DEFAULT_MAX_CONCURRENCY, target_latency: float = DEFAULT_TARGET_LATENCY, error_threshold: float = DEFAULT_ERROR_THRESHOLD, window: int = 10):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self.error_threshold = error_threshold
+        self.window = window
+
+        self.limit = max(minimum, min(initial, maximum))
+        self.active = 0
+
+        self._condition = Condition()
+        self._latencies: list[float] = []
+        self._errors = 0
+
+    def try_acquire(self) -> bool:
+        with self._condition:
+            if self.active >= self.limit:
+                return False
+            self.active += 1
+            return True
+
+    def acquire(self):
+        with self._condition:
+            self._condition.wait_for(lambda: self.active < self.limit)
+            self.active += 1
+
+    def release(self, latency: float, ok: bool):
+        with self._condition:
+            self.active -= 1
+            self._latencies.append(latency)
+            if not ok:
+                self._errors += 1
+
+            if len(self._latencies) >= self.window:
+                self._adjust()
+
+            self._condition.notify_all()
+
+    def _adjust(self):
+        error_rate = self._errors / len(self._latencies)
+        mean_latency = sum(self._latencies) / len(self._latencies)
+
+        if error_rate > self.error_threshold or mean_latency > self.target_latency:
+            limit = max(self.minimum, self.limit // 2)
+        else:
+            limit = min(self.maximum, self.limit + 1)
+
+        if limit != self.limit:
+            print(
+                f"Concurrency {self.limit} -> {limit} (errors {error_rate:.0%}, mean latency {mean_latency:.1f}s)")
+            self.limit = limit
+
+        self._latencies = []
+        self._errors = 0
+
+
+class CrawlThrottle:
+    def __init__(self, concurrency: Optional[AIMDController] = None, host_rate: float = DEFAULT_HOST_RATE, host_burst: float = DEFAULT_HOST_BURST, max_attempts: int = DEFAULT_MAX_ATTEMPTS, base_delay: float = 2, max_delay: float = 60):
+        self.concurrency = concurrency or AIMDController()
+        self.host_rate = host_rate
+        self.host_burst = host_burst
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._buckets: dict[str, TokenBucket] = {}
+        self._lock = Lock()
+
+    def host_delay(self, url: str) -> float:
+        host = urlsplit(url).netloc
+
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(
+                    self.host_rate, self.host_burst)
+
+        return bucket.reserve()
+
+    @contextmanager
+    def request(self, url: str):
+        """Holds a concurrency slot and a host token for one store request."""
+        self.concurrency.acquire()
+        time.sleep(self.host_delay(url))
+
+        start = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.concurrency.release(time.perf_counter() - start, ok)
+
+    @asynccontextmanager
+    async def request_async(self, url: str, poll_interval: float = 0.1):
+        while not self.concurrency.try_acquire():
+            await asyncio.sleep(poll_interval)
+        await asyncio.sleep(self.host_delay(url))
+
+        start = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.concurrency.release(time.perf_counter() - start, ok)
+
+    def retry(self, task: StoreTask) -> Optional[StoreTask]:
+        """The task to requeue after a failure, or None once it is out of attempts."""
+        attempt = task.attempt + 1
+        if attempt >= self.max_attempts:
+            return None
+
+        # full jitter keeps requeued stores from retrying in lockstep
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        return replace(task, attempt=attempt, ready_at=time.monotonic() + delay)
+
+
+def crawl_throttle_from_opts(opts: dict, max_requests: Optional[int] = None) -> Optional[CrawlThrottle]:
+    """Caps the AIMD limit at `max_requests`, the store requests the crawl can actually run at once."""
+    if not opts.get("throttle", True):
+        return None
+
+    maximum = opts.get("max_concurrency", DEFAULT_MAX_CONCURRENCY)
+    if max_requests is not None:
+        maximum = min(maximum, max_requests)
+
+    return CrawlThrottle(
+        concurrency=AIMDController(
+            initial=opts.get("initial_concurrency", DEFAULT_INITIAL_CONCURRENCY),
+            maximum=maximum,
+            target_latency=opts.get("target_latency", DEFAULT_TARGET_LATENCY),
+        ),
+        host_rate=opts.get("host_rate", DEFAULT_HOST_RATE),
+        host_burst=opts.get("host_burst", DEFAULT_HOST_BURST),
+        max_attempts=opts.get("max_attempts", DEFAULT_MAX_ATTEMPTS),
+    )
@@ -0,0 +1,88 @@
+from threading import Lock
+from typing import Callable, Optional, TypeVar
+
+from selenium.webdriver.chrome.webdriver import WebDriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.wait import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+
+import time
+
+T = TypeVar("T")
+
+DEFAULT_TIMEOUT = 20
+DEFAULT_POLL_INTERVAL = 0.1
+
+
+class WaitStats:
+    """Thread-safe record of how long each kind of wait actually took."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self.durations: dict[str, list[float]] = {}
+        self.timeouts: dict[str, int] = {}
+
+    def record(self, label: str, duration: float, timed_out: bool = False):
+        with self._lock:
+            self.durations.setdefault(label, []).append(duration)
+            if timed_out:
+                self.timeouts[label] = self.timeouts.get(label, 0) + 1
+
+    def summary(self) -> dict[str, dict]:
+        with self._lock:
+            durations = {k: sorted(v) for k, v in self.durations.items()}
+            timeouts = dict(self.timeouts)
+
+        summary = {}
+        for label, values in durations.items():
+            summary[label] = {
+                "count": len(values),
+                "timeouts": timeouts.get(label, 0),
+                "mean": sum(values) / len(values),
+                "p50": values[len(values) // 2],
+                "p95": values[min(len(values) - 1, int(len(values) * 0.95))],
+                "max": values[-1],
+            }
+        return summary
+
+
+class AdaptiveWait:
+    """Waits on DOM conditions instead of fixed sleeps and records the time spent."""
+
+    def __init__(self, driver: WebDriver, timeout: float = DEFAULT_TIMEOUT, poll_interval: float = DEFAULT_POLL_INTERVAL, stats: Optional[WaitStats] = None):
+        self.driver = driver
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.stats = stats
+
+    def until(self, condition: Callable[[WebDriver], T], label: str, timeout: Optional[float] = None) -> T:
+        start = time.perf_counter()
+        try:
+            result = WebDriverWait(
+                self.driver,
+                self.timeout if timeout is None else timeout,
+                poll_frequency=self.poll_interval
+            ).until(condition)
+        except TimeoutException:
+            if self.stats:
+                self.stats.record(label, time.perf_counter() - start, True)
+            raise
+
+        if self.stats:
+            self.stats.record(label, time.perf_counter() - start)
+        return result
+
+    def element(self, by: By, value: str, timeout: Optional[float] = None, label: Optional[str] = None):
+        return self.until(
+            EC.presence_of_element_located((by, value)),
+            label or value,
+            timeout
+        )
+
+    def element_count_above(self, by: By, value: str, count: int, timeout: Optional[float] = None, label: Optional[str] = None):
+        def condition(driver: WebDriver):
+            elements = driver.find_elements(by, value)
+            return elements if len(elements) > count else False
+
+        return self.until(condition, label or f"{value} count", timeout)
@@ -4,6 +4,8 @@ from models.Product import Product, product_column_map
 from models.Company import company_column_map
 from functools import wraps
 
+import re
+
 import streamlit as st
 import polars as pl
 
@@ -38,74 +40,94 @@ def container(attr_name):
     return decorator
 
 
-def format_df(df: pl.DataFrame):
-    return df.select(
+def format_df(df: pl.DataFrame | pl.LazyFrame) -> pl.LazyFrame:
+    return df.lazy().select(
         pl.col("name").alias(product_column_map['name']),
         pl.col("original_price").alias(product_column_map['original_price']),
         pl.col("final_price").alias(product_column_map['final_price']),
-        pl.when(pl.col("original_price") > 0).then(
-            (pl.col("original_price") - pl.col("final_price")) /
-            pl.col("original_price") * 100
-        ).otherwise(0).cast(pl.Float32).alias(product_column_map['discount_percentage']),
+        discount_percentage_expr().alias(
+            product_column_map['discount_percentage']),
         pl.col("company_name").alias(product_column_map['company_name']),
         pl.col("city").alias(product_column_map['city']),
         pl.col("category").alias(product_column_map['category']),
         pl.col("company_url").alias(product_column_map['company_url']),
         pl.col("image_url").alias(product_column_map['image_url']),
-        pl.col("is_closed").map_elements(lambda x: "Não" if x else "Sim", return_dtype=pl.Utf8).alias(
-            product_column_map['is_open']
-        ),
+        is_open_expr(pl.col("is_closed")).alias(product_column_map['is_open']),
     ).fill_null("")
 
 
-def get_rating_string(value: float | None):
-    if value is None or value < 0:
-        return ''
-    rounded_value = round(value)
-    return "★" * rounded_value + " " + str(value)
+def discount_percentage_expr() -> pl.Expr:
+    return pl.when(pl.col("original_price") > 0).then(
+        (pl.col("original_price") - pl.col("final_price")) /
+        pl.col("original_price") * 100
+    ).otherwise(0).cast(pl.Float32)
+
+
+def is_open_expr(is_closed: pl.Expr) -> pl.Expr:
+    return pl.when(is_closed).then(pl.lit("Não")).when(~is_closed).then(pl.lit("Sim"))
+
+
+def round_half_to_even(value: pl.Expr) -> pl.Expr:
+    """Rounds like Python's `round`, which Polars' `round` does not."""
+    floor = value.floor()
+    fraction = value - floor
+    return floor + ((fraction > 0.5) | ((fraction == 0.5) & (floor % 2 == 1))).cast(pl.Float64)
+
+
+def rating_string_expr(rating: pl.Expr) -> pl.Expr:
+    """Stars followed by the rating, e.g. "★★★★ 4.2"; null for missing ratings."""
+    stars = pl.lit("★").repeat_by(
+        round_half_to_even(rating).clip(0).cast(pl.UInt32)
+    ).list.join("")
 
+    return pl.when(rating >= 0).then(stars + pl.lit(" ") + rating.cast(pl.Utf8))
 
-def format_cdf(df: pl.DataFrame):
-    return df.select(
+
+def format_cdf(df: pl.DataFrame | pl.LazyFrame) -> pl.LazyFrame:
+    return df.lazy().select(
         pl.col("name").alias(company_column_map['name']),
-        pl.col("rating").map_elements(
-            get_rating_string,
-            return_dtype=pl.Utf8
-        ).alias(company_column_map['rating']),
+        rating_string_expr(pl.col("rating")).alias(
+            company_column_map['rating']),
         pl.col("city").alias(company_column_map['city']),
         pl.col("banners").alias(company_column_map['banners']),
         pl.col("company_url").alias(company_column_map['company_url']),
         pl.col("image_url").alias(company_column_map['image_url']),
-        pl.col("is_closed").map_elements(lambda x: "Sim" if x else "Não").alias(
-            company_column_map['is_open']
-        ),
+        is_open_expr(pl.col("is_closed")).alias(company_column_map['is_open']),
     ).fill_null("")
 
 
-def apply_filters(df: pl.DataFrame, filters: dict):
-    new_df = df.clone()
+def filter_predicate(schema: pl.Schema, filters: dict) -> pl.Expr | None:
+    """Combines every active filter into a single predicate."""
+    predicates = []
 
     for column, value in filters.items():
         if isinstance(value, str):
             if value and value != ALL_KEYWORD:
-                new_df = new_df.filter(
-                    pl.col(column).str.contains(value, case=False))
+                predicates.append(
+                    pl.col(column).str.contains(f"(?i){re.escape(value)}"))
 
         if isinstance(value, list):
             if len(value) > 0:
-                col_type = new_df.schema[column]
-
-                if col_type == pl.Utf8:
-                    new_df = new_df.filter(pl.col(column).is_in(value))
+                if isinstance(schema[column], pl.List):
+                    predicates.append(pl.col(column).list.eval(
+                        pl.element().is_in(value)).list.any())
                 else:
-                    new_df = new_df.filter(pl.col(column).map_elements(
-                        lambda x: any(item in value for item in x), return_dtype=pl.Boolean))
+                    predicates.append(pl.col(column).is_in(value))
 
         if isinstance(value, tuple):
             if len(value) != 2:
                 raise ValueError("Tuple filter must have 2 values")
 
-            new_df = new_df.filter(
-                pl.col(column).is_between(value[0], value[1]))
+            predicates.append(pl.col(column).is_between(value[0], value[1]))
+
+    if not predicates:
+        return None
+
+    return pl.all_horizontal(predicates)
+
+
+def apply_filters(df: pl.DataFrame | pl.LazyFrame, filters: dict) -> pl.LazyFrame:
+    lf = df.lazy()
+    predicate = filter_predicate(lf.collect_schema(), filters)
 
-    return new_df
+    return lf if predicate is None else lf.filter(predicate)
@@ -0,0 +1,73 @@
+"""The snapshot and element-by-element extraction paths read the same rows.
+
+Runs both paths over the saved pages in fixtures/ in a headless Chrome and
+is skipped when no browser is available.
+"""
+import pathlib
+
+import pytest
+
+from selenium.webdriver.common.by import By
+
+from models.Company import Company
+from scraper.dm_scraper import DMScraper, EXTRACTION_MODE_ELEMENTS, EXTRACTION_MODE_SNAPSHOT
+from scraper.driver_pool import FULL_PROFILE, create_driver
+
+FIXTURES = pathlib.Path(__file__).parent / "fixtures"
+
+
+@pytest.fixture(scope="module")
+def driver():
+    try:
+        driver = create_driver(FULL_PROFILE)
+    except Exception as e:
+        pytest.skip(f"Chrome is not available: {e}")
+
+    yield driver
+    driver.quit()
+
+
+def scraper(driver, mode: str) -> DMScraper:
+    s = DMScraper()
+    s.driver = driver
+    s.city = "Florianópolis - SC"
+    s.extraction_mode = mode
+    return s
+
+
+def open_fixture(driver, name: str):
+    # served over file:// so relative src and href resolve like on the site
+    driver.get((FIXTURES / name).as_uri())
+
+
+def company_rows(driver, mode: str) -> list[Company]:
+    s = scraper(driver, mode)
+    return [s.scrape_company_info(e) for e in driver.find_elements(By.CLASS_NAME, "company-list__item")]
+
+
+def test_company_paths_match(driver):
+    open_fixture(driver, "city_page.html")
+
+    snapshot = company_rows(driver, EXTRACTION_MODE_SNAPSHOT)
+    elements = company_rows(driver, EXTRACTION_MODE_ELEMENTS)
+
+    assert snapshot == elements
+    assert len(snapshot) == 5
+    assert all(c.image_url is None or "://" in c.image_url for c in snapshot)
+    assert [c.company_url is not None for c in snapshot] == [True, True, True, False, True]
+    assert snapshot[-1].is_closed
+
+
+def test_product_paths_match(driver):
+    open_fixture(driver, "store_page.html")
+
+    company = Company(name="Burger da Ilha", rating=4.8, banners=[], city="Florianópolis - SC",
+                      is_closed=False, company_url="https://www.deliverymuch.com.br/burger", image_url=None)
+
+    snapshot = scraper(driver, EXTRACTION_MODE_SNAPSHOT).scrape_store_products(company)
+    elements = scraper(driver, EXTRACTION_MODE_ELEMENTS).scrape_store_products(company)
+
+    assert snapshot.to_dicts() == elements.to_dicts()
+    assert [p["name"] for p in snapshot.to_dicts()] == [
+        "X-Burger", "X-Salada", "Refrigerante Lata"]
+    assert snapshot.to_dicts()[1]["original_price"] == 1029.9
@@ -0,0 +1,78 @@
+"""The HTTP fetcher reads the server-rendered store page like the snapshot script."""
+import pathlib
+
+import pytest
+
+from models.Company import Company
+from models.Product import ProductBatch
+from scraper.dm_scraper import DMScraper
+from scraper.exceptions import FetchException
+from scraper.fetchers import BrowserFetcher, HttpFetcher, parse_store_html
+
+FIXTURES = pathlib.Path(__file__).parent / "fixtures"
+
+COMPANY = Company(name="Burger da Ilha", rating=4.8, banners=[], city="Florianópolis - SC",
+                  is_closed=False, company_url="https://www.deliverymuch.com.br/burger", image_url=None)
+
+
+def card(name=None, original_price=None, price=None, sale_price=None, image_url=None) -> dict:
+    return {"name": name, "original_price": original_price, "price": price,
+            "sale_price": sale_price, "image_url": image_url}
+
+
+def scraper(driver=None) -> DMScraper:
+    s = DMScraper()
+    s.driver = driver
+    s.city = "Florianópolis - SC"
+    s.city_query = "FLORIANOPOLIS"
+    return s
+
+
+def test_parse_store_html():
+    groups = parse_store_html((FIXTURES / "store_page.html").read_text(encoding="utf-8"),
+                              COMPANY.company_url)
+
+    assert groups == [
+        {"category": "Lanches", "products": [
+            card(name="X-Burger", price="R$ 25,90",
+                 image_url="https://www.deliverymuch.com.br/img/x-burger.png"),
+            card(name="X-Salada", original_price="R$ 1.029,90", sale_price="R$ 999,00",
+                 image_url="https://www.deliverymuch.com.br/img/x-salada.png"),
+            card(price="R$ 10,00"),
+            card(name="Sem Preço"),
+        ]},
+        {"category": "Bebidas Geladas", "products": [
+            card(name="Refrigerante Lata", price="R$ 6,50",
+                 image_url="https://cdn.example.com/refri.png"),
+        ]},
+    ]
+
+
+def test_http_products():
+    page = (FIXTURES / "store_page.html").read_text(encoding="utf-8")
+    rows = HttpFetcher(scraper(), None).products(COMPANY, page).to_dicts()
+
+    assert [(p["category"], p["name"], p["original_price"], p["final_price"]) for p in rows] == [
+        ("lanches", "X-Burger", 25.9, 25.9),
+        ("lanches", "X-Salada", 1029.9, 999.0),
+        ("bebidas geladas", "Refrigerante Lata", 6.5, 6.5),
+    ]
+
+
+def test_http_products_without_groups():
+    with pytest.raises(FetchException):
+        HttpFetcher(scraper(), None).products(COMPANY, "<html><body></body></html>")
+
+
+def test_http_products_fall_back_to_browser(monkeypatch):
+    rendered = ProductBatch()
+    rendered.add(name="X-Burger", category="lanches")
+
+    monkeypatch.setattr(BrowserFetcher, "load", lambda self, company_info: None)
+    monkeypatch.setattr(BrowserFetcher, "products",
+                        lambda self, company_info, page: rendered)
+
+    products = HttpFetcher(scraper(driver=object()), None).products(
+        COMPANY, "<html><body></body></html>")
+
+    assert products is rendered
@@ -0,0 +1,73 @@
+"""End-to-end crawl throughput against a replayed copy of the site.
+
+Builds a recording from the pages in fixtures/ and crawls it with
+`benchmarks/replay_crawl.py`. Skipped when no browser is available. Run
+with `-s` to see the numbers:
+
+    python -m pytest tests/test_replay_crawl.py -s
+"""
+import json
+import os
+import pathlib
+import shutil
+import sys
+
+import pytest
+
+from scraper.driver_pool import FULL_PROFILE, create_driver
+from scraper.replay import ReplayServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+
+from replay_crawl import crawl  # noqa: E402
+
+FIXTURES = pathlib.Path(__file__).parent / "fixtures"
+
+# the open stores listed on city_page.html, all served with store_page.html
+STORE_PATHS = [
+    "/florianopolis/lanches/burger-da-ilha",
+    "/florianopolis/pizza/pizzaria-centro",
+    "/florianopolis/acai/acai-da-praia",
+]
+
+
+@pytest.fixture(scope="module")
+def chrome():
+    try:
+        create_driver(FULL_PROFILE).quit()
+    except Exception as e:
+        pytest.skip(f"Chrome is not available: {e}")
+
+
+@pytest.fixture
+def recording(tmp_path: pathlib.Path) -> pathlib.Path:
+    pages = tmp_path / "pages"
+    pages.mkdir()
+
+    shutil.copy(FIXTURES / "city_page.html", pages / "city.html")
+    shutil.copy(FIXTURES / "store_page.html", pages / "store.html")
+
+    index = {
+        "pages": {"/florianopolis": "city.html", **{path: "store.html" for path in STORE_PATHS}},
+        "cities": {"FLORIANOPOLIS": "/florianopolis"},
+    }
+    (tmp_path / "index.json").write_text(json.dumps(index), encoding="utf-8")
+
+    return tmp_path
+
+
+@pytest.mark.parametrize("extraction_mode", ["snapshot", "elements"])
+def test_replay_crawl(chrome, recording, extraction_mode):
+    with ReplayServer(str(recording)) as server:
+        result = crawl(["FLORIANOPOLIS"], server.opts(
+            extraction_mode=extraction_mode))
+
+    print(
+        f"\n{extraction_mode}: "
+        f"{result['stores_per_second']:.2f} stores/s, "
+        f"{result['products_per_second']:.1f} products/s, "
+        f"{result['commands_per_product']:.2f} WebDriver calls/product"
+    )
+
+    assert result["stores"] == len(STORE_PATHS)
+    assert result["products"] == 3 * len(STORE_PATHS)